@@ -0,0 +1,56 @@
+"""
+Benchmark cached datetool.to_epoch against the prior timegm conversion of each timestamp.
+
+Schedule entries repeat a small set of shift boundaries, so the timestamps are
+drawn from a pool much smaller than the batch. Runs are shown with a cold cache
+and with every timestamp distinct.
+
+    $ python benchmarks/datetool_epochs.py
+"""
+from __future__ import annotations
+
+import calendar
+import random
+import time
+from datetime import datetime
+
+from pd_utils.util import datetool
+
+BATCH = 200_000
+DISTINCT = 2_000
+
+
+def general(isotime: str) -> int:
+    """Convert as to_epoch did before, through a time tuple and timegm."""
+    return calendar.timegm(datetime.fromisoformat(isotime.rstrip("Z")).utctimetuple())
+
+
+def build(distinct: int) -> list[str]:
+    """Batch of timestamps drawn from a pool of distinct values."""
+    pool = [datetool.from_epoch(1_660_000_000 + idx * 1_800) for idx in range(distinct)]
+    return [random.choice(pool) for _ in range(BATCH)]
+
+
+def main() -> int:
+    """Print timestamps converted per second."""
+    for label, distinct in (("repeated", DISTINCT), ("distinct", BATCH)):
+        isotimes = build(distinct)
+
+        start = time.perf_counter()
+        [general(isotime) for isotime in isotimes]
+        legacy = time.perf_counter() - start
+
+        datetool.to_epoch.cache_clear()
+        start = time.perf_counter()
+        [datetool.to_epoch(isotime) for isotime in isotimes]
+        current = time.perf_counter() - start
+
+        print(
+            f"{label:<9} timegm={BATCH / legacy:>12,.0f}/s "
+            f"to_epoch={BATCH / current:>12,.0f}/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark memory held by slotted, interned models against plain dataclasses.
+
+Builds incidents and users with team memberships from fixture responses, once
+as the current models and once as plain dataclasses with a `__dict__` and no
+interning. Memory is reported per object, multiply by 100k incidents or 50k
+users for the footprint at scale. Responses are parsed per object, as they are when
+paged from the API, so repeated strings are separate objects until interned.
+
+    $ python benchmarks/model_memory.py
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import sys
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from pd_utils.model import Incident
+from pd_utils.model import UserReportRow
+
+INCIDENT = Path("tests/fixture/close-incidents/incidents.json").read_text()
+USER = Path("tests/fixture/user_report/user.json").read_text()
+INCIDENT_COUNT = 20_000
+USER_COUNT = 10_000
+TEAMS_PER_USER = 3
+
+
+def plain(model: type[Any]) -> type[Any]:
+    """Rebuild a model's fields as a plain dataclass with a __dict__."""
+    fields = [field.name for field in dataclasses.fields(model)]
+    return dataclasses.make_dataclass(f"Plain{model.__name__}", fields)
+
+
+PlainIncident = plain(Incident)
+PlainUserReportRow = plain(UserReportRow)
+
+
+def incident_resp(idx: int) -> dict[str, Any]:
+    """Freshly parsed incident response with a unique id."""
+    resp: dict[str, Any] = json.loads(INCIDENT)[0]["incidents"][0]
+    resp["id"] = f"Q{idx:013d}"
+    return resp
+
+
+def user_resp(idx: int) -> dict[str, Any]:
+    """Freshly parsed user response with a unique id."""
+    resp: dict[str, Any] = json.loads(USER)
+    resp["id"] = f"P{idx:06d}"
+    return resp
+
+
+def build_incidents(slotted: bool) -> list[Any]:
+    """Build incidents as the current or plain model."""
+    incidents: list[Any] = []
+    for idx in range(INCIDENT_COUNT):
+        incident = Incident.build_from(incident_resp(idx))
+        if not slotted:
+            incident = PlainIncident(**incident.as_row())
+        incidents.append(incident)
+    return incidents
+
+
+def build_users(slotted: bool) -> list[Any]:
+    """Build users with memberships as the current or plain model."""
+    users: list[Any] = []
+    for idx in range(USER_COUNT):
+        user = UserReportRow.build_from(user_resp(idx))
+        if not slotted:
+            user = PlainUserReportRow(**user.as_row())
+        user.observer_in = [
+            f"Team {(idx + step) % 2_000}" for step in range(TEAMS_PER_USER)
+        ]
+        users.append(user)
+    return users
+
+
+def measure(build: Callable[[bool], list[Any]], slotted: bool) -> int:
+    """Bytes still allocated after building, the objects are kept alive."""
+    tracemalloc.start()
+    if slotted:
+        objs = build(slotted)
+    else:
+        with patch.object(sys, "intern", lambda value: value):
+            objs = build(slotted)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return held
+
+
+def main() -> int:
+    """Print held memory per object for both representations."""
+    for name, build, count in (
+        ("incidents", build_incidents, INCIDENT_COUNT),
+        ("users", build_users, USER_COUNT),
+    ):
+        before = measure(build, False)
+        after = measure(build, True)
+        print(
+            f"{name:<10} plain={before / count:>7,.0f} B/obj "
+            f"slotted={after / count:>7,.0f} B/obj "
+            f"saved={1 - after / before:.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""
+Benchmark UserReportRow.build_from against the per-column rescan it replaced.
+
+The legacy approach scanned every notification rule once for each of the eight
+delay columns and the contact methods twice. The ContactProfile classifier
+buckets both in a single sweep.
+
+    $ python benchmarks/user_report_row_build.py
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from pd_utils.model import UserReportRow
+
+USER = json.loads(Path("tests/fixture/user_report/user.json").read_text())
+USER_COUNT = 20_000
+RULE_COPIES = 4
+
+
+def legacy_build(resp: dict[str, Any]) -> None:
+    """Reproduce the removed per-column scans of a user response."""
+    cmethods = [cm["type"] for cm in resp["contact_methods"] or []]
+    any([cm.get("blacklisted", False) for cm in resp["contact_methods"] or []])
+    for type_ in ("email_contact_method", "push_notification_contact_method"):
+        type_ in cmethods
+    nrules = resp["notification_rules"] or []
+    for urgency in ("high", "low"):
+        for kind in ("email", "push", "sms", "phone"):
+            [
+                str(nr["start_delay_in_minutes"])
+                for nr in nrules
+                if kind in nr["contact_method"]["type"] and urgency == nr["urgency"]
+            ]
+
+
+def main() -> int:
+    """Print rows built per second for both approaches."""
+    user = dict(USER)
+    user["notification_rules"] = USER["notification_rules"] * RULE_COPIES
+    users = [user] * USER_COUNT
+
+    start = time.perf_counter()
+    for resp in users:
+        legacy_build(resp)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for resp in users:
+        UserReportRow.build_from(resp)
+    current = time.perf_counter() - start
+
+    print(f"legacy scans:   {USER_COUNT / legacy:>10,.0f} rows/s")
+    print(f"single sweep:   {USER_COUNT / current:>10,.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark UserReport team indexing and membership hydration.
+
+Runs the user stream and membership hydration against synthetic responses at
+increasing scale, up to 50k users across 2k teams. Time per user should stay
+flat as the scale grows.
+
+    $ python benchmarks/user_report_team_index.py
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from pd_utils.report import UserReport
+from pd_utils.util import PagerDutyAPI
+
+USER = json.loads(Path("tests/fixture/user_report/user.json").read_text())
+TEAMS_PER_USER = 3
+ROLES = ("observer", "responder", "manager")
+
+
+def build_users(user_count: int, team_count: int) -> list[dict[str, Any]]:
+    """Build synthetic /users responses spread evenly across teams."""
+    users: list[dict[str, Any]] = []
+    for idx in range(user_count):
+        user = dict(USER)
+        user["id"] = f"U{idx:07d}"
+        user["teams"] = [
+            {"id": f"T{(idx + step) % team_count:05d}", "summary": f"Team {idx}"}
+            for step in range(TEAMS_PER_USER)
+        ]
+        users.append(user)
+    return users
+
+
+def build_members(users: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Build synthetic /teams/{id}/members responses from the users' teams."""
+    members: dict[str, list[dict[str, Any]]] = {}
+    for idx, user in enumerate(users):
+        for team in user["teams"]:
+            member = {"user": {"id": user["id"]}, "role": ROLES[idx % len(ROLES)]}
+            members.setdefault(team["id"], []).append(member)
+    return members
+
+
+def run(user_count: int, team_count: int) -> float:
+    """Return seconds spent indexing and hydrating for the given scale."""
+    users = build_users(user_count, team_count)
+    members = build_members(users)
+    report = UserReport(PagerDutyAPI("mock"))
+
+    def members_iter(limit: int = 100) -> list[dict[str, Any]]:
+        team_id = report._query.route.split("/")[2]
+        return members.get(team_id, [])
+
+    start = time.perf_counter()
+    with patch.object(report._query, "query_iter", return_value=users):
+        user_map, team_index = report._get_users_and_teams()
+    with patch.object(report._query, "query_iter", side_effect=members_iter):
+        memberships = report._get_team_memberships(team_index)
+    report._hydrate_team_membership(user_map, memberships)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    """Print timing per scale."""
+    team_count = 2_000
+    for user_count in (6_250, 12_500, 25_000, 50_000):
+        seconds = run(user_count, team_count)
+        per_user = seconds / user_count * 1_000_000
+        print(
+            f"users={user_count:>6} teams={team_count} "
+            f"total={seconds:.3f}s per_user={per_user:.2f}us"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
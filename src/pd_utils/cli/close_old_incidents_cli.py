@@ -20,6 +20,16 @@ def main(args_in: list[str] | None = None) -> int:
         default="10",
         help_="Incidents older than this are considered for closing (default: 10)",
     )
+    runtime.add_argument(
+        flag="--concurrency",
+        default="4",
+        help_="Number of incident activity checks to run at once (default: 4)",
+    )
+    runtime.parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="When present with --inputfile, skip incidents already closed",
+    )
     runtime.parser.add_argument(
         "--close-active",
         action="store_true",
@@ -30,6 +40,7 @@ def main(args_in: list[str] | None = None) -> int:
         action="store_true",
         help="When present, consider incidents with priority for closing",
     )
+    runtime.add_output_arguments()
     runtime.init_logging()
     args = runtime.parse_args(args_in)
 
@@ -43,8 +54,14 @@ def main(args_in: list[str] | None = None) -> int:
         close_after_days=int(args.close_after_days),
         close_active=args.close_active,
         close_priority=args.close_priority,
+        concurrency=int(args.concurrency),
+    )
+    client.run(
+        args.inputfile,
+        resume=args.resume,
+        compress=args.gzip,
+        output_format=args.output_format,
     )
-    client.run(args.inputfile)
 
     return 0
 
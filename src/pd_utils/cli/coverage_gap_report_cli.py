@@ -20,6 +20,7 @@ def main(*, _args: list[str] | None = None) -> int:
         default="14",
         help_="Number of days to look ahead for gaps, default 14",
     )
+    runtime.add_output_arguments()
     args = runtime.parse_args(_args)
 
     pdconn = runtime.get_pagerduty_connection(
@@ -30,11 +31,14 @@ def main(*, _args: list[str] | None = None) -> int:
         pagerduty_connection=pdconn,
         look_ahead_days=int(args.look_ahead),
     )
-    schedule_report, escalation_report = client.run_reports()
-
     now = datetool.utcnow_isotime().split("T")[0]
-    ioutil.write_to_file(f"schedule_gap_report{now}.csv", schedule_report)
-    ioutil.write_to_file(f"escalation_rule_gap_report{now}.csv", escalation_report)
+    fmt = args.output_format
+    client.write_reports(
+        ioutil.output_filename(f"schedule_gap_report{now}", fmt, args.gzip),
+        ioutil.output_filename(f"escalation_rule_gap_report{now}", fmt, args.gzip),
+        compress=args.gzip,
+        output_format=fmt,
+    )
 
     return 0
 
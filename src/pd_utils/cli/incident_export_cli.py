@@ -0,0 +1,67 @@
+"""Command line handler for IncidentExport."""
+from __future__ import annotations
+
+from pd_utils.tool import IncidentExport
+from pd_utils.util import datetool
+from pd_utils.util import RuntimeInit
+
+
+def main(args_in: list[str] | None = None) -> int:
+    """Run the script."""
+    runtime = RuntimeInit("incident-export")
+    runtime.init_secrets()
+    runtime.add_standard_arguments(email=False)
+    runtime.add_argument(
+        flag="--since",
+        default="",
+        help_="Export incidents created after this PD timestamp (default: 30 days ago)",
+    )
+    runtime.add_argument(
+        flag="--until",
+        default="",
+        help_="Export incidents created before this PD timestamp (default: now)",
+    )
+    runtime.add_argument(
+        flag="--shard-days",
+        default="7",
+        help_="Days of incidents pulled by each query, max 180 (default: 7)",
+    )
+    runtime.add_argument(
+        flag="--concurrency",
+        default="4",
+        help_="Number of shards to pull at once (default: 4)",
+    )
+    runtime.parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="When present, also write MTTA/MTTR summary of exported incidents",
+    )
+    runtime.add_output_arguments()
+    runtime.init_logging()
+    args = runtime.parse_args(args_in)
+
+    until = args.until or datetool.utcnow_isotime()
+    since = args.since or datetool.add_offset(until, days=-30)
+
+    pdconn = runtime.get_pagerduty_connection(
+        token=runtime.secrets.get("PAGERDUTY_TOKEN"),
+    )
+
+    client = IncidentExport(
+        pagerduty_connection=pdconn,
+        shard_days=int(args.shard_days),
+        concurrency=int(args.concurrency),
+    )
+    client.run(
+        since,
+        until,
+        summary=args.summary,
+        compress=args.gzip,
+        output_format=args.output_format,
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
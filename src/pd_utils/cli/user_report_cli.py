@@ -3,6 +3,9 @@ Command line handler for UserReport
 """
 from __future__ import annotations
 
+import json
+import os
+
 from pd_utils.report import UserReport
 from pd_utils.util import datetool
 from pd_utils.util import ioutil
@@ -20,6 +23,23 @@ def main(_args: list[str] | None = None) -> int:
         help_="List of team ids to include in report.",
         nargs="*",
     )
+    runtime.add_argument(
+        flag="--columns",
+        default="",
+        help_="List of columns to include in report. Only needed data is pulled.",
+        nargs="*",
+    )
+    runtime.add_argument(
+        flag="--delta-index",
+        default="",
+        help_="Index file of the prior run. When given, only changed rows are saved.",
+    )
+    runtime.parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="When present with --delta-index, the full report is also saved",
+    )
+    runtime.add_output_arguments()
     args = runtime.parse_args(_args)
     runtime.init_logging()
 
@@ -28,11 +48,41 @@ def main(_args: list[str] | None = None) -> int:
     )
 
     print("Starting User Report, this pull can take some time.")
-    report = UserReport(pdconn).run_report(team_ids=args.team_ids)
-
     now = datetool.utcnow_isotime().split("T")[0]
-    ioutil.write_to_file(f"user_report{now}.csv", report)
-    print(f"Report saved to user_report{now}.csv")
+
+    report = ioutil.output_filename(f"user_report{now}", args.output_format, args.gzip)
+
+    if args.delta_index:
+        previous_index: dict[str, str] = {}
+        if os.path.exists(args.delta_index):
+            previous_index = json.loads(ioutil.read_from_file(args.delta_index))
+
+        delta = ioutil.output_filename(
+            f"user_report_delta{now}", args.output_format, args.gzip
+        )
+        index = UserReport(pdconn).write_delta_report(
+            delta,
+            previous_index=previous_index,
+            team_ids=args.team_ids,
+            columns=args.columns or None,
+            snapshot_target=report if args.snapshot else None,
+            compress=args.gzip,
+            output_format=args.output_format,
+        )
+
+        ioutil.write_to_file(args.delta_index, json.dumps(index))
+        print(f"Changes saved to {delta}")
+
+    else:
+        UserReport(pdconn).write_report(
+            report,
+            team_ids=args.team_ids,
+            columns=args.columns or None,
+            compress=args.gzip,
+            output_format=args.output_format,
+        )
+
+        print(f"Report saved to {report}")
 
     return 0
 
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+from .contact_profile import ContactProfile
 from .escalation_rule_coverage import EscalationRuleCoverage
 from .incident import Incident
+from .incident_history import IncidentHistory
+from .incident_history import IncidentMetrics
 from .schedule_coverage import ScheduleCoverage
+from .user_report_row import UserReportDeltaRow
 from .user_report_row import UserReportRow
 from .user_team import UserTeam
 
 __all__ = [
+    "ContactProfile",
     "EscalationRuleCoverage",
     "Incident",
+    "IncidentHistory",
+    "IncidentMetrics",
     "ScheduleCoverage",
+    "UserReportDeltaRow",
     "UserReportRow",
     "UserTeam",
 ]
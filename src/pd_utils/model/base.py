@@ -1,19 +1,178 @@
 from __future__ import annotations
 
+import copy
 import dataclasses
 import json
+import operator
+from collections.abc import Callable
 from typing import Any
+from typing import TypeVar
+
+# Annotation names whose values are safe to share, all else is copied by as_dict
+_IMMUTABLE_TYPES = {
+    "str",
+    "int",
+    "float",
+    "bool",
+    "bytes",
+    "tuple",
+    "frozenset",
+}
+
+_T = TypeVar("_T")
+
+
+def slotted(cls: type[_T]) -> type[_T]:
+    """
+    Rebuild a dataclass with `__slots__` for its fields, dropping `__dict__`.
+
+    Equal to `dataclass(slots=True)` which needs Python 3.10. Apply above the
+    `dataclass` decorator. Names already in `__slots__` of the class, such as
+    attributes set in `__post_init__`, are kept. Fields slotted by a parent are
+    not repeated, a field redeclared with a new default uses the parent's slot.
+    """
+    inherited = {
+        name for base in cls.__mro__[1:] for name in base.__dict__.get("__slots__", ())
+    }
+    own = tuple(cls.__dict__.get("__slots__", ()))
+    fields = [field.name for field in dataclasses.fields(cls)]  # type: ignore[arg-type]
+    slots = own + tuple(name for name in fields if name not in {*inherited, *own})
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = slots
+    # Defaults live in __init__, as class attributes they would clash with slots
+    for name in (*slots, *fields, "__dict__", "__weakref__"):
+        cls_dict.pop(name, None)
+
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)  # type: ignore[misc]
 
 
 @dataclasses.dataclass(repr=False)
 class Base:
+    __slots__ = ()
+
     def __str__(self) -> str:
         return self.as_json()
 
     def as_dict(self) -> dict[str, Any]:
-        """Render object as dictionary."""
-        return dataclasses.asdict(self)
+        """Render object as dictionary. Mutable values are copied."""
+        serializer = _serializer(type(self))
+        row = dict(zip(serializer.names, serializer.getter(self)))
+        for name in serializer.copied:
+            row[name] = _copy_value(row[name])
+        return row
+
+    def as_row(self) -> dict[str, Any]:
+        """Render object as dictionary sharing its values. Do not mutate the result."""
+        serializer = _serializer(type(self))
+        return dict(zip(serializer.names, serializer.getter(self)))
 
     def as_json(self) -> str:
         """Render object as JSON string."""
         return json.dumps(self.as_dict())
+
+
+@dataclasses.dataclass(frozen=True)
+class _Serializer:
+    """Field names of a model, a getter returning their values, and which to copy."""
+
+    names: tuple[str, ...]
+    getter: Callable[[Any], tuple[Any, ...]]
+    copied: tuple[str, ...]
+
+
+_SERIALIZERS: dict[type[Base], _Serializer] = {}
+
+
+def _serializer(model: type[Base]) -> _Serializer:
+    """Serializer of a model, built once on first use."""
+    serializer = _SERIALIZERS.get(model)
+    if serializer is not None:
+        return serializer
+
+    fields = dataclasses.fields(model)
+    names = tuple(field.name for field in fields)
+    copied = tuple(field.name for field in fields if _is_mutable(field.type))
+
+    serializer = _Serializer(names, _tuple_getter(names), copied)
+    _SERIALIZERS[model] = serializer
+    return serializer
+
+
+def _tuple_getter(names: tuple[str, ...]) -> Callable[[Any], tuple[Any, ...]]:
+    """Getter of named attributes, always returning a tuple."""
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+
+    # attrgetter returns a bare value for a single name
+    def getter(obj: Any) -> tuple[Any, ...]:
+        return tuple(getattr(obj, name) for name in names)
+
+    return getter
+
+
+def split_annotation(annotation: Any) -> tuple[list[str], bool]:
+    """
+    Split a field annotation into its union members and whether it is optional.
+
+    Members are returned without None and keep their parameters, such as
+    `(["list[str]"], True)` for `list[str] | None`.
+    """
+    # Annotations are strings under `from __future__ import annotations`
+    if not isinstance(annotation, str):
+        annotation = getattr(annotation, "__name__", repr(annotation))
+
+    members = [member.strip() for member in _split_outside_brackets(annotation, "|")]
+    optional = "None" in members
+    return [member for member in members if member != "None"], optional
+
+
+def split_generic(member: str) -> tuple[str, list[str]]:
+    """Split a union member into its name and parameters, `dict[str, int]` and more."""
+    name, _, inner = member.partition("[")
+    if not inner:
+        return name, []
+    params = _split_outside_brackets(inner[:-1], ",")
+    return name, [param.strip() for param in params]
+
+
+def _split_outside_brackets(annotation: str, separator: str) -> list[str]:
+    """Split annotation on separator outside of brackets."""
+    parts: list[str] = []
+    depth = 0
+    start = 0
+    for idx, char in enumerate(annotation):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(annotation[start:idx])
+            start = idx + 1
+    parts.append(annotation[start:])
+    return parts
+
+
+def _is_mutable(annotation: Any) -> bool:
+    """True when a field annotation could hold a value that needs copying."""
+    members, _ = split_annotation(annotation)
+    for member in members:
+        name, params = split_generic(member)
+        if name not in _IMMUTABLE_TYPES:
+            return True
+        if any(_is_mutable(param) for param in params if param != "..."):
+            return True
+    return False
+
+
+def _copy_value(value: Any) -> Any:
+    """Copy a value as `dataclasses.asdict` would, rendering nested models."""
+    if isinstance(value, Base):
+        return value.as_dict()
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    if isinstance(value, dict):
+        return {_copy_value(key): _copy_value(item) for key, item in value.items()}
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(_copy_value(item) for item in value)
+    return copy.deepcopy(value)
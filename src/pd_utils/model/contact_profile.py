@@ -0,0 +1,56 @@
+"""Bucket a user's contact methods and notification rules in a single sweep."""
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+METHOD_KINDS = ("email", "push", "sms", "phone")
+
+# Memo of contact method type to kind, e.g. "sms_contact_method": "sms"
+_kind_cache: dict[str, str | None] = {}
+
+
+def method_kind(type_: str) -> str | None:
+    """Return the kind of a contact method type, `None` if unknown."""
+    try:
+        return _kind_cache[type_]
+    except KeyError:
+        kind = next((kind for kind in METHOD_KINDS if kind in type_), None)
+        _kind_cache[type_] = kind
+        return kind
+
+
+@dataclasses.dataclass
+class ContactProfile:
+    """Contact methods and notification rule delays of a user, bucketed by type."""
+
+    contact_types: frozenset[str] = frozenset()
+    has_blocked: bool = False
+    delays: dict[tuple[str, str], list[str]] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def build_from(cls, resp: dict[str, Any]) -> ContactProfile:
+        """Build from PD API user response with expanded contacts and rules."""
+        contact_types: set[str] = set()
+        has_blocked = False
+        for cmethod in resp["contact_methods"] or []:
+            contact_types.add(cmethod["type"])
+            has_blocked = has_blocked or cmethod.get("blacklisted", False)
+
+        delays: dict[tuple[str, str], list[str]] = {}
+        for nrule in resp["notification_rules"] or []:
+            kind = method_kind(nrule["contact_method"]["type"])
+            if kind is None:
+                continue
+            bucket = delays.setdefault((nrule["urgency"], kind), [])
+            bucket.append(str(nrule["start_delay_in_minutes"]))
+
+        return cls(
+            contact_types=frozenset(contact_types),
+            has_blocked=has_blocked,
+            delays=delays,
+        )
+
+    def get_delay(self, urgency: str, kind: str) -> list[str] | None:
+        """Return delay times in minutes for given urgency and method kind."""
+        return self.delays.get((urgency, kind))
@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import dataclasses
+import sys
 from typing import Any
 
 from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
 
 
+@slotted
 @dataclasses.dataclass
 class EscalationRuleCoverage(Base):
     policy_id: str
@@ -30,8 +33,9 @@ class EscalationRuleCoverage(Base):
                 if target["type"] == "user_reference":
                     direct_contact = True
                 if target["type"] == "schedule_reference":
-                    names.append(target["summary"])
-                    targets.append(target["id"])
+                    # Schedules are shared by many policies
+                    names.append(sys.intern(target["summary"]))
+                    targets.append(sys.intern(target["id"]))
             rules.append(
                 cls(
                     policy_id=resp["id"],
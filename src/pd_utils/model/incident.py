@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import dataclasses
+import sys
 from typing import Any
 
 from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
+from pd_utils.util import datetool
 
 
+@slotted
 @dataclasses.dataclass
 class Incident(Base):
+    # Set in __post_init__, fields are added by slotted
+    __slots__ = ("created_epoch",)
+
     incident_id: str
     incident_number: int
     title: str
@@ -17,6 +24,10 @@ class Incident(Base):
     has_priority: bool
     urgency: str
 
+    def __post_init__(self) -> None:
+        # Parsed once, filters compare against this instead of created_at
+        self.created_epoch = datetool.to_epoch(self.created_at)
+
     @classmethod
     def build_from(cls, resp: dict[str, Any]) -> Incident:
         """Build Incident object from PagerDuty API response."""
@@ -25,8 +36,8 @@ class Incident(Base):
             incident_number=resp["incident_number"],
             title=resp["title"],
             created_at=resp["created_at"],
-            status=resp["status"],
+            status=sys.intern(resp["status"]),
             last_status_change_at=resp["last_status_change_at"],
             has_priority=bool(resp["priority"]),
-            urgency=resp["urgency"],
+            urgency=sys.intern(resp["urgency"]),
         )
@@ -0,0 +1,105 @@
+"""Model incident history rows for export and their summary metrics."""
+from __future__ import annotations
+
+import dataclasses
+import sys
+from typing import Any
+
+from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
+from pd_utils.util import datetool
+
+
+@slotted
+@dataclasses.dataclass
+class IncidentHistory(Base):
+    incident_id: str
+    incident_number: int
+    title: str
+    service_id: str
+    service_name: str
+    urgency: str
+    priority: str
+    status: str
+    created_at: str
+    acknowledged_at: str
+    resolved_at: str
+    seconds_to_ack: int | None
+    seconds_to_resolve: int | None
+
+    @classmethod
+    def build_from(
+        cls,
+        resp: dict[str, Any],
+        first_ack: str = "",
+    ) -> IncidentHistory:
+        """
+        Build IncidentHistory object from PagerDuty API response.
+
+        PagerDuty clears `acknowledgements` on resolve, pass the time of the first
+        acknowledge log entry as `first_ack` for resolved incidents.
+        """
+        acks = [ack["at"] for ack in resp.get("acknowledgements") or []]
+        if first_ack:
+            acks.append(first_ack)
+        acknowledged_at = min(acks) if acks else ""
+
+        resolved_at = resp.get("resolved_at") or ""
+        if not resolved_at and resp["status"] == "resolved":
+            resolved_at = resp["last_status_change_at"]
+
+        created = datetool.to_epoch(resp["created_at"])
+        service = resp.get("service") or {}
+        priority = resp.get("priority") or {}
+
+        return cls(
+            incident_id=resp["id"],
+            incident_number=resp["incident_number"],
+            title=resp["title"],
+            service_id=sys.intern(service.get("id", "")),
+            service_name=sys.intern(service.get("summary", "")),
+            urgency=sys.intern(resp["urgency"]),
+            priority=sys.intern(priority.get("summary", "")),
+            status=sys.intern(resp["status"]),
+            created_at=resp["created_at"],
+            acknowledged_at=acknowledged_at,
+            resolved_at=resolved_at,
+            seconds_to_ack=(
+                datetool.to_epoch(acknowledged_at) - created
+                if acknowledged_at
+                else None
+            ),
+            seconds_to_resolve=(
+                datetool.to_epoch(resolved_at) - created if resolved_at else None
+            ),
+        )
+
+
+@slotted
+@dataclasses.dataclass
+class IncidentMetrics(Base):
+    """Running MTTA/MTTR of incident history rows."""
+
+    incidents: int = 0
+    acknowledged: int = 0
+    resolved: int = 0
+    mean_seconds_to_ack: float | None = None
+    mean_seconds_to_resolve: float | None = None
+
+    def add(self, row: IncidentHistory) -> None:
+        """Add an incident history row to the metrics."""
+        self.incidents += 1
+
+        if row.seconds_to_ack is not None:
+            self.acknowledged += 1
+            mean = self.mean_seconds_to_ack or 0.0
+            self.mean_seconds_to_ack = (
+                mean + (row.seconds_to_ack - mean) / self.acknowledged
+            )
+
+        if row.seconds_to_resolve is not None:
+            self.resolved += 1
+            mean = self.mean_seconds_to_resolve or 0.0
+            self.mean_seconds_to_resolve = (
+                mean + (row.seconds_to_resolve - mean) / self.resolved
+            )
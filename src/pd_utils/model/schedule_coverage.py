@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import dataclasses
+import sys
 from typing import Any
 
 from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
 
 
+@slotted
 @dataclasses.dataclass
 class ScheduleCoverage(Base):
     pd_id: str
@@ -19,7 +22,8 @@ class ScheduleCoverage(Base):
         """Build model from API response of PagerDuty."""
         final = resp["schedule"].get("final_schedule") or {}
         rse = final["rendered_schedule_entries"] or []
-        entries = [(se["start"], se["end"]) for se in rse]
+        # Shift boundaries repeat across schedules
+        entries = [(sys.intern(se["start"]), sys.intern(se["end"])) for se in rse]
 
         return cls(
             pd_id=resp["schedule"].get("id") or "",
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import dataclasses
+import sys
 from typing import Any
 
 from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
+from pd_utils.model.contact_profile import ContactProfile
 
 
+@slotted
 @dataclasses.dataclass
 class UserReportRow(Base):
     """Empty User object for User Report."""
@@ -39,45 +43,48 @@ class UserReportRow(Base):
     @classmethod
     def build_from(cls, resp: dict[str, Any]) -> UserReportRow:
         """Build a User object from PD API response, excludes team information."""
-        cmethods = [cm["type"] for cm in resp["contact_methods"] or []]
-        blocked = any(
-            [cm.get("blacklisted", False) for cm in resp["contact_methods"] or []]
-        )
-        nrules = resp["notification_rules"] or []
+        profile = ContactProfile.build_from(resp)
+        ctypes = profile.contact_types
         return cls(
             id=resp["id"],
             name=resp["name"],
             html_url=resp["html_url"],
             email=resp["email"],
             title=resp["job_title"],
-            base_role=resp["role"],
-            timezone=resp["time_zone"],
+            base_role=sys.intern(resp["role"]),
+            timezone=sys.intern(resp["time_zone"]),
             invite_pending=resp["invitation_sent"],
-            has_email="email_contact_method" in cmethods,
-            has_push="push_notification_contact_method" in cmethods,
-            has_sms="sms_contact_method" in cmethods,
-            has_phone="phone_contact_method" in cmethods,
-            has_blocked=blocked,
-            high_urgency_email_delay=UserReportRow._get_delay(nrules, "email", "high"),
-            high_urgency_push_delay=UserReportRow._get_delay(nrules, "push", "high"),
-            high_urgency_sms_delay=UserReportRow._get_delay(nrules, "sms", "high"),
-            high_urgency_phone_delay=UserReportRow._get_delay(nrules, "phone", "high"),
-            low_urgency_email_delay=UserReportRow._get_delay(nrules, "email", "low"),
-            low_urgency_push_delay=UserReportRow._get_delay(nrules, "push", "low"),
-            low_urgency_sms_delay=UserReportRow._get_delay(nrules, "sms", "low"),
-            low_urgency_phone_delay=UserReportRow._get_delay(nrules, "phone", "low"),
+            has_email="email_contact_method" in ctypes,
+            has_push="push_notification_contact_method" in ctypes,
+            has_sms="sms_contact_method" in ctypes,
+            has_phone="phone_contact_method" in ctypes,
+            has_blocked=profile.has_blocked,
+            high_urgency_email_delay=profile.get_delay("high", "email"),
+            high_urgency_push_delay=profile.get_delay("high", "push"),
+            high_urgency_sms_delay=profile.get_delay("high", "sms"),
+            high_urgency_phone_delay=profile.get_delay("high", "phone"),
+            low_urgency_email_delay=profile.get_delay("low", "email"),
+            low_urgency_push_delay=profile.get_delay("low", "push"),
+            low_urgency_sms_delay=profile.get_delay("low", "sms"),
+            low_urgency_phone_delay=profile.get_delay("low", "phone"),
         )
 
-    @staticmethod
-    def _get_delay(
-        nrules: list[dict[str, Any]],
-        type_: str,
-        urgency: str,
-    ) -> list[str] | None:
-        """Return delay times in minutes for given notification types."""
-        delays = [
-            str(nr["start_delay_in_minutes"])
-            for nr in nrules
-            if type_ in nr["contact_method"]["type"] and urgency == nr["urgency"]
-        ]
-        return delays or None
+
+@slotted
+@dataclasses.dataclass
+class UserReportDeltaRow(UserReportRow):
+    """
+    User Report row flagged with how it changed since a prior run.
+
+    Removed rows only carry the user's id. Flags default to None, not False, so
+    the other columns of a removed row are left blank.
+    """
+
+    invite_pending: bool | None = None  # type: ignore[assignment]
+    on_schedule: bool | None = None  # type: ignore[assignment]
+    has_email: bool | None = None  # type: ignore[assignment]
+    has_push: bool | None = None  # type: ignore[assignment]
+    has_sms: bool | None = None  # type: ignore[assignment]
+    has_phone: bool | None = None  # type: ignore[assignment]
+    has_blocked: bool | None = None  # type: ignore[assignment]
+    change_type: str = ""
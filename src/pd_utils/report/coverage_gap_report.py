@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import logging
 from typing import Any
+from typing import IO
 
 from pd_utils.model import EscalationRuleCoverage as EscCoverage
 from pd_utils.model import ScheduleCoverage as SchCoverage
@@ -37,6 +38,7 @@ class CoverageGapReport:
         self._max_query_limit = max_query_limit
         self._schedule_map: dict[str, SchCoverage] = {}
         self._escalation_map: dict[str, EscCoverage] = {}
+        self._schedule_intervals: dict[str, datetool.IntervalSet] = {}
 
         self._query = pagerduty_connection
 
@@ -47,14 +49,56 @@ class CoverageGapReport:
         Raises:
             QueryError
         """
+        self._map_coverages()
+
+        schedule = ioutil.to_csv_string(self._schedule_map.values())
+        escalation = ioutil.to_csv_string(self._escalation_map.values())
+        return schedule, escalation
+
+    def write_reports(
+        self,
+        schedule_target: str | IO[str],
+        escalation_target: str | IO[str],
+        *,
+        compress: bool = False,
+        output_format: str = "csv",
+    ) -> tuple[int, int]:
+        """
+        Runs reports, writing rows of each to its target. Returns rows written.
+
+        Args:
+            schedule_target: Filename/path, "-" for stdout, or open text handle
+            escalation_target: Filename/path, "-" for stdout, or open text handle
+            compress: When true, compress the output
+            output_format: Name of a registered output format (default: csv)
+
+        Raises:
+            QueryError
+        """
+        self._map_coverages()
+
+        schedule = ioutil.write_stream(
+            schedule_target,
+            self._schedule_map.values(),
+            output_format=output_format,
+            compress=compress,
+        )
+        escalation = ioutil.write_stream(
+            escalation_target,
+            self._escalation_map.values(),
+            output_format=output_format,
+            compress=compress,
+        )
+        return schedule, escalation
+
+    def _map_coverages(self) -> None:
+        """Pull and map schedule and escalation coverages."""
+        # Intervals cached from a prior run would hide changes to the schedules
+        self._schedule_intervals = {}
         self._map_schedule_coverages(self._get_all_schedule_ids())
         self._map_escalation_coverages(self._get_all_escalations())
         self._hydrate_escalation_coverage_flags()
 
-        schedule = ioutil.to_csv_string(list(self._schedule_map.values()))
-        escalation = ioutil.to_csv_string(list(self._escalation_map.values()))
-        return schedule, escalation
-
     def get_schedule_coverage(self, schedule_id: str) -> SchCoverage | None:
         """Get ScheduleCoverage from PagerDuty with specific schedule id."""
         schobj: SchCoverage | None = None
@@ -117,18 +161,23 @@ class CoverageGapReport:
         """Test all mapped escalations and set each `has_gap` flag for rules."""
         # NOTE: Schedules should be mapped before this is called
 
+        since = datetool.to_epoch(self._since)
+        until = datetool.to_epoch(self._until)
+
         for ep_rule in self._escalation_map.values():
-            times = self._extract_entries(ep_rule.rule_target_ids)
-            ep_rule.is_fully_covered = datetool.is_covered(
-                time_slots=times,
-                range_start=self._since,
-                range_stop=self._until,
-            )
-
-    def _extract_entries(self, sch_ids: tuple[str, ...]) -> list[tuple[str, str]]:
-        """Extract all timestamp entries from given schedules"""
-        entries: list[tuple[str, str]] = []
-        schedules = [self._schedule_map[k] for k in sch_ids if k in self._schedule_map]
-        for schedule in schedules:
-            entries.extend(list(schedule.entries))
-        return entries
+            coverage = self._get_coverage(ep_rule.rule_target_ids)
+            ep_rule.is_fully_covered = bool(coverage) and coverage.covers(since, until)
+
+    def _get_coverage(self, sch_ids: tuple[str, ...]) -> datetool.IntervalSet:
+        """Combined on-call coverage of given schedules."""
+        coverage = datetool.IntervalSet()
+        for sch_id in sch_ids:
+            schedule = self._schedule_map.get(sch_id)
+            if schedule is None:
+                continue
+            # Schedules are shared by many rules, build each one's intervals once
+            if sch_id not in self._schedule_intervals:
+                intervals = datetool.IntervalSet.from_isotimes(schedule.entries)
+                self._schedule_intervals[sch_id] = intervals
+            coverage |= self._schedule_intervals[sch_id]
+        return coverage
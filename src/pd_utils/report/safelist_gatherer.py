@@ -35,14 +35,31 @@ Example Usage:
         full_ip_list = pd_ip_gatherer.get_all_safelist()
         eu_ip_list = pd_ip_gatherer.get_eu_safelist()
         us_ip_list = pd_ip_gatherer.get_us_safelist()
+
+        matcher = pd_ip_gatherer.SafelistMatcher.from_safelist()
+        matcher.matches("127.0.0.1")
+
+Caching:
+
+    Pulled lists are cached on disk for `CACHE_TTL_SECONDS` and revalidated
+    with conditional requests once stale. If PagerDuty cannot be reached the
+    last cached copy is used. The cache is kept in `~/.cache/pd-utils` or the
+    directory set by `$PD_UTILS_CACHE_DIR`.
 """
 from __future__ import annotations
 
+import bisect
+import ipaddress
 import json
 import logging
+import os
 import sys
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
 from http.client import HTTPSConnection
-
+from typing import Any
 
 SOURCE_ROUTES: dict[str, list[str]] = {
     "us": [
@@ -56,6 +73,11 @@ SOURCE_ROUTES: dict[str, list[str]] = {
 }
 
 TIMEOUT_SECONDS = 3
+CACHE_TTL_SECONDS = 3600
+CACHE_DIR = os.getenv(
+    "PD_UTILS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pd-utils"),
+)
 
 log = logging.getLogger(__name__)
 
@@ -64,6 +86,10 @@ def _get_url_page(url: str, route: str) -> str:
     """
     HTTPS GET request a url, return the text of the response.
 
+    Responses are cached on disk. A fresh cached copy is returned without a
+    request, a stale one is revalidated, and the cached copy is returned when
+    the request fails.
+
     Args:
         url: URL of page to pull, exclude HTTPS:// (e.g. "app.pagerduty.com")
         route: Route following url. e.g. "/webhook_ip"
@@ -71,16 +97,67 @@ def _get_url_page(url: str, route: str) -> str:
     Returns:
         String content returned from GET of target url/route, can be empty
     """
-    conn = HTTPSConnection(host=url, timeout=TIMEOUT_SECONDS)
+    route = route if route.startswith("/") else f"/{route}"
+    cache_file = os.path.join(CACHE_DIR, f"{url}{route}".replace("/", "_"))
+    cached = _read_cache(cache_file)
+
+    if cached and time.time() - cached["fetched_at"] < CACHE_TTL_SECONDS:
+        log.debug("Using cached %s%s", url, route)
+        return cached["body"]
 
-    conn.request("GET", route if route.startswith("/") else f"/{route}")
-    resp = conn.getresponse()
+    headers: dict[str, str] = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    conn = HTTPSConnection(host=url, timeout=TIMEOUT_SECONDS)
+    try:
+        conn.request("GET", route, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read().decode()
+    except (HTTPException, OSError) as err:
+        log.error("Unable to reach %s, %s. %s", url, route, err)
+        return cached["body"] if cached else ""
+    finally:
+        conn.close()
+
+    if resp.status == 304 and cached:
+        _write_cache(cache_file, {**cached, "fetched_at": time.time()})
+        return cached["body"]
 
     if resp.status not in range(200, 300):
         log.error("Invalid response from %s, %s. %d", url, route, resp.status)
-        return ""
-
-    return resp.read().decode()
+        return cached["body"] if cached else ""
+
+    cache = {
+        "fetched_at": time.time(),
+        "etag": resp.getheader("ETag"),
+        "last_modified": resp.getheader("Last-Modified"),
+        "body": body,
+    }
+    _write_cache(cache_file, cache)
+    return body
+
+
+def _read_cache(cache_file: str) -> dict[str, Any] | None:
+    """Read cached response, None if missing or unreadable."""
+    try:
+        with open(cache_file, encoding="utf-8") as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_file: str, cache: dict[str, Any]) -> None:
+    """Write cached response, replacing the prior copy in one step."""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(f"{cache_file}.tmp", "w", encoding="utf-8") as outfile:
+            json.dump(cache, outfile)
+        os.replace(f"{cache_file}.tmp", cache_file)
+    except OSError as err:
+        log.warning("Unable to cache %s. %s", cache_file, err)
 
 
 def _get_webhooks_ips(region: str | None = None, new_source: bool = True) -> list[str]:
@@ -95,22 +172,22 @@ def _get_webhooks_ips(region: str | None = None, new_source: bool = True) -> lis
 
     full_list: list[str] = []
 
-    for target_region in regions:
-
-        url, route = SOURCE_ROUTES[target_region]
+    # Regions are pulled at the same time
+    with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+        results = executor.map(
+            lambda target: _get_url_page(*SOURCE_ROUTES[target]),
+            regions,
+        )
 
-        result = _get_url_page(url, route)
-
-        full_list.extend(json.loads(result) if result else [])
+        for result in results:
+            full_list.extend(json.loads(result) if result else [])
 
     return full_list
 
 
 def get_all_safelist() -> set[str]:
     """Return all safelist IPs (US and Euro region) in the form of a set."""
-    us_set = get_us_safelist()
-    eu_set = get_eu_safelist()
-    return us_set.union(eu_set)
+    return set(_get_webhooks_ips())
 
 
 def get_us_safelist() -> set[str]:
@@ -123,6 +200,80 @@ def get_eu_safelist() -> set[str]:
     return set(_get_webhooks_ips("eu"))
 
 
+class SafelistMatcher:
+    """Match IP addresses against safelisted addresses and networks."""
+
+    def __init__(self, addresses: Iterable[str]) -> None:
+        """
+        Match IP addresses against safelisted addresses and networks.
+
+        Addresses are collapsed into networks and stored as sorted integer
+        ranges per IP version, so each match is a binary search.
+
+        Args:
+            addresses: IP addresses or CIDR networks, IPv4 or IPv6. Invalid
+                entries are logged and skipped
+        """
+        networks: dict[int, list[Any]] = {4: [], 6: []}
+        for address in addresses:
+            try:
+                network = ipaddress.ip_network(address.strip(), strict=False)
+            except ValueError:
+                log.warning("Skipping invalid safelist entry: %s", address)
+                continue
+            networks[network.version].append(network)
+
+        self._starts: dict[int, list[int]] = {}
+        self._ends: dict[int, list[int]] = {}
+        for version, version_networks in networks.items():
+            starts: list[int] = []
+            ends: list[int] = []
+            for network in ipaddress.collapse_addresses(version_networks):
+                start = int(network.network_address)
+                end = int(network.broadcast_address)
+                # Join ranges that touch but do not collapse into one network
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._starts[version] = starts
+            self._ends[version] = ends
+
+    @classmethod
+    def from_safelist(cls, region: str | None = None) -> SafelistMatcher:
+        """
+        Build a matcher from PagerDuty's current webhook safelist.
+
+        Args:
+            region: Valid values are `US` or `EU`, case agnostic. `None` uses both
+        """
+        return cls(_get_webhooks_ips(region))
+
+    def __contains__(self, ip: object) -> bool:
+        return isinstance(ip, str) and self.matches(ip)
+
+    def __len__(self) -> int:
+        """Number of ranges held."""
+        return sum(len(starts) for starts in self._starts.values())
+
+    def matches(self, ip: str) -> bool:
+        """True if given IP address is in the safelist. Invalid addresses are not."""
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+
+        # IPv4 clients reaching an IPv6 listener arrive as ::ffff:a.b.c.d
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+
+        value = int(address)
+        starts = self._starts[address.version]
+        idx = bisect.bisect_right(starts, value) - 1
+        return idx >= 0 and value <= self._ends[address.version][idx]
+
+
 def console_output() -> int:
     """Display results to console."""
     cli = {"us": get_us_safelist, "eu": get_eu_safelist}
@@ -3,19 +3,47 @@ Pull a user report including general information on user accounts.
 """
 from __future__ import annotations
 
+import dataclasses
+import hashlib
+import json
 import logging
-from typing import Any
+import sys
+from collections.abc import Generator
+from typing import IO
 from typing import NamedTuple
 
+from pd_utils.model import UserReportDeltaRow
 from pd_utils.model import UserReportRow
-from pd_utils.model import UserTeam
 from pd_utils.util import ioutil
 from pd_utils.util import PagerDutyAPI
 
 
-class _Team(NamedTuple):
-    team_name: str
-    team_id: str
+# Columns which require additional pulls or include[] expansions to hydrate
+_SCHEDULE_COLUMNS = frozenset({"on_schedule"})
+_MEMBERSHIP_COLUMNS = frozenset({"observer_in", "responder_in", "manager_in"})
+_CONTACT_METHOD_COLUMNS = frozenset(
+    {"has_email", "has_push", "has_sms", "has_phone", "has_blocked"}
+)
+_NOTIFICATION_RULE_COLUMNS = frozenset(
+    {
+        "high_urgency_email_delay",
+        "high_urgency_push_delay",
+        "high_urgency_sms_delay",
+        "high_urgency_phone_delay",
+        "low_urgency_email_delay",
+        "low_urgency_push_delay",
+        "low_urgency_sms_delay",
+        "low_urgency_phone_delay",
+    }
+)
+_ALL_INCLUDES = ("notification_rules", "contact_methods")
+
+
+class _ReportPlan(NamedTuple):
+    columns: list[str]
+    includes: tuple[str, ...]
+    pull_memberships: bool
+    pull_schedules: bool
 
 
 class UserReport:
@@ -37,50 +65,269 @@ class UserReport:
         self._query = pagerduty_connection
         self._max_query_limit = max_query_limit
 
-    def run_report(self, team_ids: list[str] | None = None) -> str:
+    def run_report(
+        self,
+        team_ids: list[str] | None = None,
+        columns: list[str] | None = None,
+    ) -> str:
         """
         Run report. Returns csv string.
 
         Args:
             team_ids: List of team ids to isolate in report
+            columns: List of columns to include in report, all when empty
+
+        Raises:
+            ValueError: When an unknown column is requested
+        """
+        plan = self._plan_report(columns)
+
+        user_map = self._build_user_map(team_ids, plan)
+
+        return ioutil.to_csv_string(user_map.values(), plan.columns)
+
+    def write_report(
+        self,
+        target: str | IO[str],
+        team_ids: list[str] | None = None,
+        columns: list[str] | None = None,
+        *,
+        compress: bool = False,
+        output_format: str = "csv",
+    ) -> int:
+        """
+        Run report, writing rows to target as rendered. Returns rows written.
+
+        Args:
+            target: Filename/path to write, "-" for stdout, or an open text handle
+            team_ids: List of team ids to isolate in report
+            columns: List of columns to include in report, all when empty
+            compress: When true, compress the output
+            output_format: Name of a registered output format (default: csv)
+
+        Raises:
+            ValueError: When an unknown column is requested
+        """
+        plan = self._plan_report(columns)
+
+        user_map = self._build_user_map(team_ids, plan)
+
+        return ioutil.write_stream(
+            target,
+            user_map.values(),
+            plan.columns,
+            output_format=output_format,
+            compress=compress,
+        )
+
+    def run_delta_report(
+        self,
+        previous_index: dict[str, str],
+        team_ids: list[str] | None = None,
+        columns: list[str] | None = None,
+        *,
+        snapshot: bool = False,
+    ) -> tuple[str, str, dict[str, str]]:
+        """
+        Run report, only rows changed since the run of `previous_index` are kept.
+
+        Rows carry a `change_type` column of `added`, `changed`, or `removed`.
+        Removed rows only include the user's id, other columns are blank.
+
+        Args:
+            previous_index: Index returned by the prior run, empty on first run
+            team_ids: List of team ids to isolate in report
+            columns: List of columns to include in report, all when empty
+            snapshot: When true, the full report is also rendered
+
+        Returns:
+            (delta, snapshot, index)
+            delta: csv string of changed rows, can be empty
+            snapshot: csv string of full report, empty unless `snapshot` is true
+            index: Key:pair of {pagerduty_id: row_hash} to store for the next run
+
+        Raises:
+            ValueError: When an unknown column is requested
         """
+        plan = self._plan_report(columns)
+
+        user_map = self._build_user_map(team_ids, plan)
+
+        index: dict[str, str] = {}
+        deltas = self._delta_rows(user_map, plan, previous_index, index)
+        delta_csv = ioutil.to_csv_string(deltas, ["change_type", *plan.columns])
+
+        snapshot_csv = ""
+        if snapshot:
+            snapshot_csv = ioutil.to_csv_string(user_map.values(), plan.columns)
+
+        return delta_csv, snapshot_csv, index
+
+    def write_delta_report(
+        self,
+        target: str | IO[str],
+        previous_index: dict[str, str],
+        team_ids: list[str] | None = None,
+        columns: list[str] | None = None,
+        *,
+        snapshot_target: str | IO[str] | None = None,
+        compress: bool = False,
+        output_format: str = "csv",
+    ) -> dict[str, str]:
+        """
+        Run delta report, writing rows to targets. See `run_delta_report`.
+
+        Args:
+            target: Filename/path to write, "-" for stdout, or an open text handle
+            previous_index: Index returned by the prior run, empty on first run
+            team_ids: List of team ids to isolate in report
+            columns: List of columns to include in report, all when empty
+            snapshot_target: When given, the full report is also written here
+            compress: When true, compress the output
+            output_format: Name of a registered output format (default: csv)
+
+        Returns:
+            Key:pair of {pagerduty_id: row_hash} to store for the next run
+
+        Raises:
+            ValueError: When an unknown column is requested
+        """
+        plan = self._plan_report(columns)
+
+        user_map = self._build_user_map(team_ids, plan)
+
+        index: dict[str, str] = {}
+        ioutil.write_stream(
+            target,
+            self._delta_rows(user_map, plan, previous_index, index),
+            ["change_type", *plan.columns],
+            output_format=output_format,
+            compress=compress,
+        )
+
+        if snapshot_target is not None:
+            ioutil.write_stream(
+                snapshot_target,
+                user_map.values(),
+                plan.columns,
+                output_format=output_format,
+                compress=compress,
+            )
+
+        return index
+
+    def _delta_rows(
+        self,
+        user_map: dict[str, UserReportRow],
+        plan: _ReportPlan,
+        previous_index: dict[str, str],
+        index: dict[str, str],
+    ) -> Generator[UserReportDeltaRow, None, None]:
+        """Yield rows changed since `previous_index`, filling `index` as it goes."""
+        count = 0
+        for user_id, user in user_map.items():
+            row_hash = self._hash_row(user, plan.columns)
+            index[user_id] = row_hash
+
+            prior_hash = previous_index.get(user_id)
+            if prior_hash == row_hash:
+                continue
+            change_type = "added" if prior_hash is None else "changed"
+            count += 1
+            yield UserReportDeltaRow(**user.as_row(), change_type=change_type)
+
+        for user_id in sorted(previous_index.keys() - index.keys()):
+            count += 1
+            yield UserReportDeltaRow(id=user_id, change_type="removed")
+
+        self.log.info("Discovered %d changed users since last run.", count)
+
+    def _build_user_map(
+        self,
+        team_ids: list[str] | None,
+        plan: _ReportPlan,
+    ) -> dict[str, UserReportRow]:
+        """Pull and hydrate users following the report plan."""
         # user_map is a key:pair of {pagerduty_id: UserReportRow}
-        user_map, teams = self._get_users_and_teams(team_ids)
+        # team_index is a key:pair of {team_id: team_name}
+        user_map, team_index = self._get_users_and_teams(team_ids, plan.includes)
+
+        if plan.pull_memberships:
+            memberships = self._get_team_memberships(team_index)
+            self._hydrate_team_membership(user_map, memberships)
+
+        if plan.pull_schedules:
+            scheduled_users = self._get_users_on_schedules()
+            self._hydrate_on_schedule_flag(user_map, scheduled_users)
+
+        return user_map
 
-        user_teams = self._get_team_memberships(teams)
+    @staticmethod
+    def _hash_row(user: UserReportRow, columns: list[str]) -> str:
+        """Compact hash of the selected columns of a row."""
+        user_dict = user.as_row()
+        content = json.dumps([user_dict[column] for column in columns])
+        return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
 
-        scheduled_users = self._get_users_on_schedules()
+    def _plan_report(self, columns: list[str] | None = None) -> _ReportPlan:
+        """Plan which pulls and include[] expansions the requested columns need."""
+        all_columns = [field.name for field in dataclasses.fields(UserReportRow)]
+        columns = columns or all_columns
 
-        self._hydrate_team_membership(user_map, user_teams)
-        self._hydrate_on_schedule_flag(user_map, scheduled_users)
+        unknown = set(columns) - set(all_columns)
+        if unknown:
+            raise ValueError(f"Unknown columns requested: {sorted(unknown)}")
 
-        return ioutil.to_csv_string(list(user_map.values()))
+        selected = set(columns)
+        includes: list[str] = []
+        if selected & _NOTIFICATION_RULE_COLUMNS:
+            includes.append("notification_rules")
+        if selected & _CONTACT_METHOD_COLUMNS:
+            includes.append("contact_methods")
+
+        plan = _ReportPlan(
+            columns=columns,
+            includes=tuple(includes),
+            pull_memberships=bool(selected & _MEMBERSHIP_COLUMNS),
+            pull_schedules=bool(selected & _SCHEDULE_COLUMNS),
+        )
+        self.log.debug("Report plan: %s", plan)
+
+        return plan
 
     def _get_users_and_teams(
         self,
         team_ids: list[str] | None = None,
-    ) -> tuple[dict[str, UserReportRow], set[_Team]]:
-        """Pull all users and unique team names discovered."""
+        includes: tuple[str, ...] = _ALL_INCLUDES,
+    ) -> tuple[dict[str, UserReportRow], dict[str, str]]:
+        """Pull all users and index the unique teams discovered by id."""
         self.log.info("Pulling user object, this can take a momement.")
 
         self._query.set_query_target("/users", "users")
         self._query.set_query_params(
             {
-                "include[]": ["notification_rules", "contact_methods"],
+                "include[]": list(includes) or None,
                 "team_ids[]": team_ids or None,
             }
         )
 
         user_map: dict[str, UserReportRow] = {}
-        teams: set[_Team] = set()
+        team_index: dict[str, str] = {}
         for resp in self._query.query_iter(limit=self._max_query_limit):
+            # Without an include[] these are bare references, drop them unread
+            for key in _ALL_INCLUDES:
+                if key not in includes:
+                    resp[key] = None
             user = UserReportRow.build_from(resp)
             user_map[user.id] = user
-            teams = teams.union(self._extract_teams(resp["teams"]))
+            for team in resp["teams"] or []:
+                team_index[team["id"]] = team["summary"]
 
-        self.log.info("Discovered %d users and %d teams.", len(user_map), len(teams))
+        self.log.info(
+            "Discovered %d users and %d teams.", len(user_map), len(team_index)
+        )
 
-        return user_map, teams
+        return user_map, team_index
 
     def _get_users_on_schedules(self) -> set[str]:
         """Return unique PagerDuty IDs of users found on schedules."""
@@ -98,45 +345,47 @@ class UserReport:
 
         return users
 
-    def _extract_teams(self, teams: list[dict[str, Any]] | None) -> set[_Team]:
-        """Extract unique team_ids from list of teams"""
-        return {_Team(team["summary"], team["id"]) for team in teams or []}
-
-    def _get_team_memberships(self, teams: set[_Team]) -> list[UserTeam]:
-        """Get membership details of teams from PagerDuty."""
+    def _get_team_memberships(
+        self,
+        team_index: dict[str, str],
+    ) -> dict[str, dict[str, list[str]]]:
+        """
+        Get membership details of teams from PagerDuty.
 
-        self.log.info("Pulling membership details of %d teams.", len(teams))
+        Returns:
+            Index of {user_id: {team_role: ["team_name, team_id", ...]}}
+        """
+        self.log.info("Pulling membership details of %d teams.", len(team_index))
 
         self._query.set_query_params({})
-        user_teams: list[UserTeam] = []
-        for team_name, team_id in teams:
+        memberships: dict[str, dict[str, list[str]]] = {}
+        member_count = 0
+        for team_id, team_name in team_index.items():
+            team = f"{team_name}, {team_id}"
             self._query.set_query_target(f"/teams/{team_id}/members", "members")
             for member in self._query.query_iter(limit=self._max_query_limit):
-                user_teams.append(
-                    UserTeam(
-                        user_id=member["user"]["id"],
-                        team_id=team_id,
-                        team_name=team_name,
-                        team_role=member["role"],
-                    )
-                )
+                roles = memberships.setdefault(member["user"]["id"], {})
+                roles.setdefault(sys.intern(member["role"]), []).append(team)
+                member_count += 1
 
-        self.log.info("Discovered %d membership details.", len(user_teams))
+        self.log.info("Discovered %d membership details.", member_count)
 
-        return user_teams
+        return memberships
 
     def _hydrate_team_membership(
         self,
         user_map: dict[str, UserReportRow],
-        user_teams: list[UserTeam],
+        memberships: dict[str, dict[str, list[str]]],
     ) -> None:
         """Hydrate team membership by role into user_map."""
-        for user_team in user_teams:
-            team = f"{user_team.team_name}, {user_team.team_id}"
-            attr = f"{user_team.team_role}_in"
-            if getattr(user_map[user_team.user_id], attr) is None:
-                setattr(user_map[user_team.user_id], attr, [])
-            getattr(user_map[user_team.user_id], attr).append(team)
+        for user_id, roles in memberships.items():
+            # Members of a team may fall outside of a team_ids filtered user_map
+            user = user_map.get(user_id)
+            if user is None:
+                continue
+            user.observer_in = roles.get("observer")
+            user.responder_in = roles.get("responder")
+            user.manager_in = roles.get("manager")
 
     def _hydrate_on_schedule_flag(
         self,
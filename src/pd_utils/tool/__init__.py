@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from .close_old_incidents import CloseOldIncidents
+from .incident_export import IncidentExport
 
 __all__ = [
     "CloseOldIncidents",
+    "IncidentExport",
 ]
@@ -2,17 +2,27 @@
 from __future__ import annotations
 
 import datetime
+import itertools
+import json
 import logging
+import math
+import os
+from collections.abc import Generator
+from collections.abc import Iterable
 from typing import Any
 from typing import TypedDict
 
+import httpx
 from pd_utils.model import Incident
 from pd_utils.util import datetool
 from pd_utils.util import ioutil
 from pd_utils.util import PagerDutyAPI
+from pd_utils.util import threadutil
 
 TITLE_TAG = "[closed by automation]"
-NOW = datetime.datetime.utcnow()
+OPEN_STATUSES = ["triggered", "acknowledged"]
+# Maximum incidents accepted by a single bulk PUT /incidents
+BULK_LIMIT = 250
 
 
 class IncidentRow(TypedDict):
@@ -38,6 +48,7 @@ class CloseOldIncidents:
         close_after_days: int = 10,
         close_active: bool = False,
         close_priority: bool = False,
+        concurrency: int = 4,
     ) -> None:
         """
         Used to clean up and close old incidents in PagerDuty.
@@ -47,6 +58,7 @@ class CloseOldIncidents:
             close_after_days: Incidents older than this are considered for closing
             close_after: When true, old incidents are closed regardless of activity
             close_priority: When true, consider incidents with priority for closing
+            concurrency: Number of activity checks to run at once (default: 4)
         """
 
         self._pdapi = pagerduty_connection
@@ -54,128 +66,399 @@ class CloseOldIncidents:
         self._close_after_seconds = close_after_days * 86_400
         self._close_active = close_active
         self._close_priority = close_priority
+        self._concurrency = max(concurrency, 1)
+        self._check_errors: list[Incident] = []
+        self._now = datetool.utcnow_epoch()
 
-    def run(self, inputfile: str | None = None) -> None:
-        """Run the script."""
+    def run(
+        self,
+        inputfile: str | None = None,
+        resume: bool = False,
+        *,
+        compress: bool = False,
+        output_format: str = "csv",
+    ) -> None:
+        """
+        Run the script.
+
+        The preview is always csv, it is the `inputfile` of the following run.
+
+        Args:
+            inputfile: Preview csv of incidents to close. When empty, a preview is made
+            resume: When true, incidents journaled as closed for `inputfile` are skipped
+            compress: When true, compress the result and error files
+            output_format: Format of the result and error files (default: csv)
+        """
         filedate = datetime.datetime.now().strftime("%Y%m%d-%H%M")
+        # One reference clock for every filter in this run
+        self._now = datetool.utcnow_epoch()
 
         if inputfile:
             self.log.info("Reading input file: %s", inputfile)
-
-            to_close_dict = ioutil.csv_to_dict(ioutil.read_from_file(inputfile))
-            to_close = [Incident(**row) for row in to_close_dict]
-            self.log.info("Read %s inactives, starting actions", len(to_close))
-
-            successes, errors = self._close_incidents(to_close)
-
-            ioutil.write_to_file(
-                filepath=f"close-old-incidents-{filedate}.csv",
-                content=ioutil.to_csv_string(successes),
+            journal = f"{inputfile}.journal"
+
+            # Rows are read as incidents are closed, the file is never held whole
+            to_close: Iterable[Incident]
+            to_close = ioutil.read_csv_models(inputfile, Incident)
+
+            if resume:
+                # Failures are retried, a later success replaces them in the journal
+                closed = {
+                    incident_id
+                    for incident_id, (success, _) in self._read_journal(journal).items()
+                    if success
+                }
+                to_close = (i for i in to_close if i.incident_id not in closed)
+                self.log.info("Resuming, %d incidents already closed", len(closed))
+            elif os.path.exists(journal):
+                self.log.info("Starting new journal, removing %s", journal)
+                os.remove(journal)
+
+            self._close_incidents(to_close, journal)
+
+            # Journal holds the results of this and any resumed runs
+            results = self._read_journal(journal).values()
+
+            ioutil.write_stream(
+                ioutil.output_filename(
+                    f"close-old-incidents-{filedate}", output_format, compress
+                ),
+                (incident for success, incident in results if success),
+                output_format=output_format,
+                compress=compress,
             )
-            ioutil.write_to_file(
-                filepath=f"close-old-incidents-errors-{filedate}.csv",
-                content=ioutil.to_csv_string(errors),
+            ioutil.write_stream(
+                ioutil.output_filename(
+                    f"close-old-incidents-errors-{filedate}", output_format, compress
+                ),
+                (incident for success, incident in results if not success),
+                output_format=output_format,
+                compress=compress,
             )
 
         else:
             self.log.info("Pulling incidents from PagerDuty, this can take a while")
-            all_incidents = self._get_all_incidents()
-            self.log.info("Found %s open incidents", len(all_incidents))
+            preview = f"close-old-incidents-preview-{filedate}.csv"
 
-            isolated = self._isolate_old_incidents(all_incidents)
+            # Each stage is a generator, incidents stream through to the preview
+            isolated = self._get_all_incidents()
+            isolated = self._isolate_old_incidents(isolated)
             isolated = self._isolate_nonpriority_incidents(isolated)
 
             # Inactive scanning requires additional calls to PD, run last
             if not self._close_active:
                 isolated = self._isolate_inactive_incidents(isolated)
 
-            ioutil.write_to_file(
-                filepath=f"close-old-incidents-preview-{filedate}.csv",
-                content=ioutil.to_csv_string(isolated),
+            rows = ioutil.write_csv_stream(preview, isolated)
+            self.log.info("Wrote %d rows to %s", rows, preview)
+
+            ioutil.write_stream(
+                ioutil.output_filename(
+                    f"close-old-incidents-check-errors-{filedate}",
+                    output_format,
+                    compress,
+                ),
+                self._check_errors,
+                output_format=output_format,
+                compress=compress,
             )
 
-    def _isolate_old_incidents(self, incidents: list[Incident]) -> list[Incident]:
-        """Isolate old incidents from list of incidents."""
-        old_incidents: list[Incident] = []
+    def _isolate_old_incidents(
+        self,
+        incidents: Iterable[Incident],
+    ) -> Generator[Incident, None, None]:
+        """Isolate old incidents from stream of incidents."""
+        cutoff = self._cutoff_epoch()
+        count = 0
         for incident in incidents:
-            delta = datetool.to_seconds(incident.created_at, NOW.isoformat())
-
-            if delta > self._close_after_seconds:
-                old_incidents.append(incident)
-        self.log.info("Isolated %s old incidents", len(old_incidents))
-
-        return old_incidents
+            if incident.created_epoch < cutoff:
+                count += 1
+                yield incident
+        self.log.info("Isolated %s old incidents", count)
 
     def _isolate_nonpriority_incidents(
         self,
-        incidents: list[Incident],
-    ) -> list[Incident]:
-        """Isolate nonpriority incidents from list of incidents."""
-        nonpriority_incidents: list[Incident] = []
+        incidents: Iterable[Incident],
+    ) -> Generator[Incident, None, None]:
+        """Isolate nonpriority incidents from stream of incidents."""
+        count = 0
         for incident in incidents:
             if not incident.has_priority or self._close_priority:
-                nonpriority_incidents.append(incident)
-        self.log.info("Isolated %s nonpriority incidents", len(nonpriority_incidents))
+                count += 1
+                yield incident
+        self.log.info("Isolated %s nonpriority incidents", count)
+
+    def _isolate_inactive_incidents(
+        self,
+        incidents: Iterable[Incident],
+    ) -> Generator[Incident, None, None]:
+        """Isolate inactive incidents, picking the strategy with fewer requests."""
+        stream = iter(incidents)
+
+        # Avoid estimating the sweep when there is nothing to check
+        first = next(stream, None)
+        if first is None:
+            self.log.info("Isolated 0 inactive incidents")
+            return
+        stream = itertools.chain([first], stream)
+
+        sweep_requests = self._estimate_sweep_requests()
+
+        if sweep_requests is not None:
+            # Only buffer enough incidents to know if the sweep is cheaper
+            buffered = list(itertools.islice(stream, sweep_requests + 1))
+            stream = itertools.chain(buffered, stream)
+
+            if len(buffered) > sweep_requests:
+                self.log.info("Sweeping %d pages of recent log entries", sweep_requests)
+                yield from self._isolate_inactive_by_sweep(stream)
+                return
+
+        self.log.info("Checking log entries of each incident")
+        yield from self._isolate_inactive_by_lookup(stream)
+
+    def _isolate_inactive_by_sweep(
+        self,
+        incidents: Iterable[Incident],
+    ) -> Generator[Incident, None, None]:
+        """Isolate inactive incidents against one sweep of recent log entries."""
+        active_ids = self._get_recently_active_ids()
 
-        return nonpriority_incidents
+        count = 0
+        for incident in incidents:
+            if incident.incident_id not in active_ids:
+                count += 1
+                yield incident
+        self.log.info("Isolated %s inactive incidents", count)
 
-    def _isolate_inactive_incidents(self, incidents: list[Incident]) -> list[Incident]:
-        """Isolate inactive incidents from list of incidents."""
-        inactive_incidents: list[Incident] = []
+    def _isolate_inactive_by_lookup(
+        self,
+        incidents: Iterable[Incident],
+    ) -> Generator[Incident, None, None]:
+        """
+        Isolate inactive incidents by checking the log entries of each incident.
 
-        for idx, incident in enumerate(incidents):
+        Incidents which cannot be checked are recorded in `_check_errors`.
+        """
+        self._check_errors = []
+        cutoff = self._cutoff_epoch()
+        count = 0
+
+        lookups = threadutil.bounded_map(
+            lambda incident: self._get_newest_log_entry(incident.incident_id),
+            incidents,
+            workers=self._concurrency,
+        )
+        for idx, (incident, lst_log) in enumerate(lookups, 1):
             if idx % 100 == 0:
-                self.log.info("Checking incident %s to %s", idx, idx + 100)
+                self.log.info("Checked %s incidents", idx)
 
-            lst_log = self._get_newest_log_entry(incident.incident_id)
-            seconds = datetool.to_seconds(lst_log["created_at"], NOW.isoformat())
+            if lst_log is None:
+                self._check_errors.append(incident)
+                continue
 
-            if seconds > self._close_after_seconds:
+            if datetool.to_epoch(lst_log["created_at"]) < cutoff:
                 self.log.debug("Incident %s has no activity", incident.incident_number)
-                inactive_incidents.append(incident)
-        self.log.info("Isolated %s inactive incidents", len(inactive_incidents))
+                count += 1
+                yield incident
+
+        self.log.info("Isolated %s inactive incidents", count)
+        if self._check_errors:
+            self.log.error("Unable to check %s incidents", len(self._check_errors))
+
+    def _estimate_sweep_requests(self) -> int | None:
+        """Estimate requests needed to sweep recent log entries, None if unknown."""
+        if self._close_after_seconds > PagerDutyAPI.max_range_days * 86_400:
+            return None
+
+        params = {"since": self._cutoff_isotime(), "total": True, "limit": 1}
+        try:
+            resp = self._pdapi.get("/log_entries", params=params)
+        except httpx.HTTPError as err:
+            self.log.error("Error estimating log entry volume: %s", err)
+            return None
+
+        if not resp or resp.get("total") is None:
+            return None
+
+        return math.ceil(resp["total"] / self._max_query_limit)
+
+    def _get_recently_active_ids(self) -> set[str]:
+        """Pull IDs of all incidents with log entries after the close after cutoff."""
+        log_entries = self._pdapi.window_iter(
+            "/log_entries",
+            "log_entries",
+            {"time_zone": "UTC"},
+            self._cutoff_isotime(),
+            datetool.from_epoch(self._now),
+            limit=self._max_query_limit,
+        )
+
+        active_ids = {log_entry["incident"]["id"] for log_entry in log_entries}
+
+        self.log.info("Discovered %d recently active incidents.", len(active_ids))
+        return active_ids
+
+    def _cutoff_epoch(self) -> int:
+        """Epoch of the close after cutoff, older is considered for closing."""
+        return self._now - self._close_after_seconds
+
+    def _cutoff_isotime(self) -> str:
+        """PD timestamp of the close after cutoff, older is considered for closing."""
+        return datetool.from_epoch(self._cutoff_epoch())
+
+    def _get_all_incidents(self) -> Generator[Incident, None, None]:
+        """Pull open incidents created before the close after cutoff from PagerDuty."""
+        until = self._cutoff_isotime()
+        since = self._get_oldest_open_incident_time()
+
+        if since is None or since >= until:
+            self.log.info("Discovered 0 incidents.")
+            return
+
+        params = {"time_zone": "UTC", "statuses[]": OPEN_STATUSES}
+        incidents = self._pdapi.window_iter(
+            "/incidents",
+            "incidents",
+            params,
+            since,
+            until,
+            limit=self._max_query_limit,
+            max_days=PagerDutyAPI.max_range_days,
+        )
+
+        count = 0
+        for resp in incidents:
+            # The API cannot filter on priority, drop before building models
+            if resp["priority"] and not self._close_priority:
+                continue
+            count += 1
+            yield Incident.build_from(resp)
 
-        return inactive_incidents
+        self.log.info("Discovered %d incidents.", count)
 
-    def _get_all_incidents(self) -> list[Incident]:
-        """Pull all open incidents from PagerDuty."""
+    def _get_oldest_open_incident_time(self) -> str | None:
+        """Pull created_at of the oldest open incident, None if there are none."""
         params = {
             "time_zone": "UTC",
-            "statuses[]": ["triggered", "acknowledged"],
+            "statuses[]": OPEN_STATUSES,
             "date_range": "all",
+            "sort_by": "created_at:asc",
         }
-        self._pdapi.set_query_target("/incidents", "incidents")
-        self._pdapi.set_query_params(params)
+        oldest = next(self._pdapi.list_iter("/incidents", "incidents", params, 1), None)
+        return oldest["created_at"] if oldest else None
+
+    def _get_newest_log_entry(self, incident_id: str) -> dict[str, Any] | None:
+        """Pull most recent log entry from incident, None on failure. Thread safe."""
+        try:
+            resp = self._pdapi.get(
+                route=f"/incidents/{incident_id}/log_entries",
+                params={"time_zone": "UTC", "limit": 1},
+            )
+        except httpx.HTTPError as err:
+            self.log.error("Error pulling log entry of %s: %s", incident_id, err)
+            return None
 
-        incidents = [inc for inc in self._pdapi.query_iter(self._max_query_limit)]
+        log_entries = resp["log_entries"] if resp else None
+        return log_entries[0] if log_entries else None
 
-        self.log.info("Discovered %d incidents.", len(incidents))
-        return [Incident.build_from(incident) for incident in incidents]
+    def _close_incidents(
+        self,
+        incidents: Iterable[Incident],
+        journal: str | None = None,
+    ) -> tuple[int, int]:
+        """
+        Close incidents provided, in batches as they are read. Returns success and
+        error counts.
 
-    def _get_newest_log_entry(self, incident_id: str) -> dict[str, Any]:
-        """Pull most recent log entry from incident."""
-        self._pdapi.set_query_target(
-            route=f"/incidents/{incident_id}/log_entries",
-            object_name="log_entries",
-        )
-        self._pdapi.set_query_params({"time_zone": "UTC"})
-        resp, _, _ = self._pdapi._query(limit=1)
-        return resp[0]
+        Args:
+            incidents: Incidents to close
+            journal: When provided, results are appended as each batch completes
+        """
+        self.log.info("Start close actions on incidents.")
+        stream = iter(incidents)
+        success = 0
+        error = 0
+        while True:
+            batch = list(itertools.islice(stream, BULK_LIMIT))
+            if not batch:
+                break
+            self.log.debug("Closing %d incidents", len(batch))
+
+            batch_success, batch_error = self._resolve_incident_batch(batch)
+            success += len(batch_success)
+            error += len(batch_error)
+
+            if journal:
+                self._write_journal(journal, batch_success, batch_error)
+
+        self.log.info("Closed %d incidents, %d errors.", success, error)
+        return success, error
 
-    def _close_incidents(
+    def _write_journal(
+        self,
+        journal: str,
+        successes: list[Incident],
+        errors: list[Incident],
+    ) -> None:
+        """Append results of closed incidents to the journal file."""
+        lines = [
+            json.dumps({"success": success, "incident": incident.as_row()}) + "\n"
+            for success, incidents in ((True, successes), (False, errors))
+            for incident in incidents
+        ]
+        ioutil.append_to_file(journal, "".join(lines))
+
+    def _read_journal(self, journal: str) -> dict[str, tuple[bool, Incident]]:
+        """Read journal file into {incident_id: (success, Incident)}, last wins."""
+        if not os.path.exists(journal):
+            return {}
+
+        results: dict[str, tuple[bool, Incident]] = {}
+        for line in ioutil.read_from_file(journal).splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave the final line partially written
+                self.log.warning("Skipping unreadable journal line: %s", line)
+                continue
+            incident = Incident(**entry["incident"])
+            results[incident.incident_id] = (entry["success"], incident)
+
+        return results
+
+    def _resolve_incident_batch(
         self,
         incidents: list[Incident],
     ) -> tuple[list[Incident], list[Incident]]:
-        """Close incidents provided. Returns Success list and Error list."""
-        self.log.info("Start close actions on %d incidents.", len(incidents))
-        success: list[Incident] = []
-        error: list[Incident] = []
-        for incident in incidents:
-            self.log.debug("Closing incident %s", incident.incident_number)
-            if self._resolve_incident(incident.incident_id, incident.title):
-                success.append(incident)
-            else:
-                error.append(incident)
+        """Resolve incidents in one request. Falls back to single updates on error."""
+        payloads = [
+            {
+                "id": incident.incident_id,
+                "type": "incident_reference",
+                "status": "resolved",
+                "title": f"{TITLE_TAG} {incident.title}",
+            }
+            for incident in incidents
+        ]
+        resp = self._pdapi.put_bulk("/incidents", "incidents", payloads)
+
+        if resp is None:
+            self.log.warning("Bulk resolve failed, retrying incidents one at a time.")
+            success: list[Incident] = []
+            error: list[Incident] = []
+            for incident in incidents:
+                if self._resolve_incident(incident.incident_id, incident.title):
+                    success.append(incident)
+                else:
+                    error.append(incident)
+            return success, error
+
+        resolved_ids = {resolved["id"] for resolved in resp}
+        success = [inc for inc in incidents if inc.incident_id in resolved_ids]
+        error = [inc for inc in incidents if inc.incident_id not in resolved_ids]
+        for incident in error:
+            self.log.error("Error resolving incident %s", incident.incident_id)
 
         return success, error
 
@@ -0,0 +1,220 @@
+"""Export incident history from PagerDuty with time to ack and resolve."""
+from __future__ import annotations
+
+import datetime
+import logging
+from collections.abc import Generator
+from collections.abc import Iterable
+from typing import Any
+
+from pd_utils.model import IncidentHistory
+from pd_utils.model import IncidentMetrics
+from pd_utils.util import datetool
+from pd_utils.util import ioutil
+from pd_utils.util import PagerDutyAPI
+from pd_utils.util import threadutil
+
+
+class IncidentExport:
+    """Export incident history between two dates."""
+
+    log = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        pagerduty_connection: PagerDutyAPI,
+        *,
+        shard_days: int = 7,
+        concurrency: int = 4,
+    ) -> None:
+        """
+        Export incident history between two dates.
+
+        The date range is split into shards which are pulled at the same time.
+
+        Args:
+            pagerduty_connection: PagerDutyAPI object to use
+            shard_days: Days of incidents pulled by each query (default: 7, max: 180)
+            concurrency: Number of shards to pull at once (default: 4)
+        """
+        self._pdapi = pagerduty_connection
+        self._max_query_limit = 100
+        self._shard_days = min(max(shard_days, 1), PagerDutyAPI.max_range_days)
+        self._concurrency = max(concurrency, 1)
+        self.metrics = IncidentMetrics()
+        # First acks of incidents resolved before `_swept_until`, set by `export`
+        self._first_acks: dict[str, str] = {}
+        self._swept_until = ""
+
+    def run(
+        self,
+        since: str,
+        until: str,
+        summary: bool = False,
+        compress: bool = False,
+        output_format: str = "csv",
+    ) -> None:
+        """
+        Run the script.
+
+        Args:
+            since: PD timestamp, start of date range to export
+            until: PD timestamp, end of date range to export
+            summary: When true, also write MTTA/MTTR summary of exported incidents
+            compress: When true, compress the output
+            output_format: Name of a registered output format (default: csv)
+        """
+        filedate = datetime.datetime.now().strftime("%Y%m%d-%H%M")
+        export = ioutil.output_filename(
+            f"incident-export-{filedate}", output_format, compress
+        )
+
+        self.log.info("Pulling incidents from %s to %s", since, until)
+        rows = ioutil.write_stream(
+            export,
+            self.export(since, until),
+            output_format=output_format,
+            compress=compress,
+        )
+        self.log.info("Wrote %d rows to %s", rows, export)
+
+        if summary:
+            summary_file = ioutil.output_filename(
+                f"incident-export-summary-{filedate}", output_format
+            )
+            ioutil.write_stream(
+                summary_file, [self.metrics], output_format=output_format
+            )
+            self.log.info("Wrote summary to %s", summary_file)
+
+    def export(self, since: str, until: str) -> Generator[IncidentHistory, None, None]:
+        """
+        Pull incident history between two dates, ordered by shard.
+
+        Each row is added to `metrics` as it is yielded.
+
+        Args:
+            since: PD timestamp, start of date range to export
+            until: PD timestamp, end of date range to export
+        """
+        self.metrics = IncidentMetrics()
+        self._first_acks = self._sweep_first_acks(since, until)
+        self._swept_until = until
+
+        shards = datetool.split_range(since, until, self._shard_days)
+        self.log.info("Split range into %d shards", len(shards))
+
+        pulls = threadutil.bounded_map(
+            lambda shard: self._get_shard(*shard, last=shard == shards[-1]),
+            shards,
+            workers=self._concurrency,
+        )
+        for (shard_since, _), rows in pulls:
+            self.log.debug("Pulled %d incidents from %s shard", len(rows), shard_since)
+            yield from self._tally(rows)
+
+        self.log.info("Exported %d incidents", self.metrics.incidents)
+
+    def _tally(
+        self,
+        rows: Iterable[IncidentHistory],
+    ) -> Generator[IncidentHistory, None, None]:
+        """Add rows to metrics as they pass."""
+        for row in rows:
+            self.metrics.add(row)
+            yield row
+
+    def _get_shard(
+        self,
+        since: str,
+        until: str,
+        last: bool = False,
+    ) -> list[IncidentHistory]:
+        """
+        Pull all incidents created in a shard. Thread safe.
+
+        Incidents created on a shard boundary are left to the later shard unless
+        this is the last shard.
+        """
+        params = {"time_zone": "UTC", "sort_by": "created_at:asc"}
+        incidents = self._pdapi.window_iter(
+            "/incidents",
+            "incidents",
+            params,
+            since,
+            until,
+            limit=self._max_query_limit,
+        )
+        return [
+            IncidentHistory.build_from(resp, self._first_ack(resp))
+            for resp in incidents
+            if last or resp["created_at"] < until
+        ]
+
+    def _sweep_first_acks(self, since: str, until: str) -> dict[str, str]:
+        """
+        Map incident id to its first acknowledge log entry between two dates.
+
+        PagerDuty clears `acknowledgements` on resolve. One sweep of the export
+        range finds the ack of each incident resolved within it.
+        """
+        # Only the overview entries (trigger, ack, resolve...) are needed
+        params = {"time_zone": "UTC", "is_overview": "true"}
+        entries = self._pdapi.window_iter(
+            "/log_entries",
+            "log_entries",
+            params,
+            since,
+            until,
+            limit=self._max_query_limit,
+            max_days=PagerDutyAPI.max_range_days,
+        )
+
+        first_acks: dict[str, str] = {}
+        for entry in entries:
+            if entry["type"] != "acknowledge_log_entry":
+                continue
+            incident_id: str = (entry.get("incident") or {}).get("id", "")
+            first_ack = first_acks.get(incident_id)
+            if first_ack is None or entry["created_at"] < first_ack:
+                first_acks[incident_id] = entry["created_at"]
+
+        self.log.info("Found first acks of %d incidents", len(first_acks))
+        return first_acks
+
+    def _first_ack(self, resp: dict[str, Any]) -> str:
+        """
+        Time of the first ack of a resolved incident, empty if none. Thread safe.
+
+        Incidents resolved after the swept range pull their own log entries.
+        """
+        if resp["status"] != "resolved":
+            # Acknowledgements are only cleared on resolve
+            return ""
+
+        first_ack = self._first_acks.get(resp["id"])
+        if first_ack is not None:
+            return first_ack
+
+        resolved_at = resp.get("resolved_at") or resp["last_status_change_at"]
+        if self._swept_until and resolved_at < self._swept_until:
+            # Created and resolved within the sweep, never acknowledged
+            return ""
+
+        params = {
+            "time_zone": "UTC",
+            "is_overview": "true",
+            "since": resp["created_at"],
+        }
+        entries = self._pdapi.list_iter(
+            f"/incidents/{resp['id']}/log_entries",
+            "log_entries",
+            params,
+            limit=self._max_query_limit,
+        )
+        acks = [
+            entry["created_at"]
+            for entry in entries
+            if entry["type"] == "acknowledge_log_entry"
+        ]
+        return min(acks) if acks else ""
@@ -7,16 +7,54 @@ from __future__ import annotations
 
 import json
 import logging
+import queue
+import sqlite3
 import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
 from datetime import datetime
+from http.client import HTTPException
 from http.client import HTTPSConnection
+from http.client import RemoteDisconnected
 from typing import Any
+from typing import IO
+from typing import NamedTuple
 
-__all__ = ["build_alert", "send_alert"]
+__all__ = [
+    "AlertCoalescer",
+    "AlertResult",
+    "EventSpool",
+    "build_alert",
+    "send_alert",
+    "send_alerts",
+]
+
+EVENTS_HOST = "events.pagerduty.com"
+EVENTS_ROUTE = "/v2/enqueue"
+# Seconds a connection waits on PagerDuty before giving up
+TIMEOUT_SECONDS = 30
 
 log = logging.getLogger(__name__)
 
 
+class AlertResult(NamedTuple):
+    """Result of one event sent by `send_alerts`."""
+
+    position: int  # Position of the event in the events given
+    status: int  # HTTP status, 0 when no response was received
+    response: str  # Response body or error message
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
 def build_alert(
     routing_key: str,
     title: str,
@@ -71,21 +109,529 @@ def send_alert(
     # If no dedup is given, use epoch timestamp
     if dedup is None:
         dedup = str(datetime.utcnow().timestamp())
-    url = "events.pagerduty.com"
-    route = "/v2/enqueue"
 
-    conn = HTTPSConnection(host=url, port=443)
+    conn = HTTPSConnection(host=EVENTS_HOST, port=443, timeout=TIMEOUT_SECONDS)
     alert = build_alert(routing_key, title, alert_body, dedup)
-    conn.request("POST", route, json.dumps(alert))
-    result = conn.getresponse()
+    try:
+        conn.request("POST", EVENTS_ROUTE, json.dumps(alert))
+        result = conn.getresponse()
+
+        log.info("Alert status: %s", result.status)
+        log.info("Alert response: %s", result.read())
+    finally:
+        conn.close()
+
+
+def send_alerts(
+    events: Iterable[dict[str, Any]],
+    workers: int = 4,
+) -> list[AlertResult]:
+    """
+    Send many PagerDuty events, reusing one keep-alive connection per worker.
+
+    Events are pulled from the iterable as workers are free, so at most a few
+    events per worker are held at once.
+
+    Args
+        events: Complete event payloads, see `build_alert` for the shape
+        workers: Number of events to send at once
+
+    Returns
+        AlertResult of each event, in the order events were given
+    """
+    workers = max(workers, 1)
+    pending: queue.Queue[tuple[int, dict[str, Any]] | None] = queue.Queue(workers * 4)
+    results: list[AlertResult] = []
+
+    threads = [
+        threading.Thread(target=_send_worker, args=(pending, results), daemon=True)
+        for _ in range(workers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    try:
+        for item in enumerate(events):
+            pending.put(item)
+    finally:
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - start
+    failed = sum(not result.ok for result in results)
+    log.info(
+        "Sent %d events in %.2f seconds (%.1f/s), %d failed",
+        len(results),
+        elapsed,
+        len(results) / elapsed if elapsed else 0.0,
+        failed,
+    )
+    return sorted(results)
+
+
+def _send_worker(
+    pending: queue.Queue[tuple[int, dict[str, Any]] | None],
+    results: list[AlertResult],
+) -> None:
+    """Send events from the queue over one connection until given None."""
+    conn = HTTPSConnection(host=EVENTS_HOST, port=443, timeout=TIMEOUT_SECONDS)
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            # A dead worker would leave the feeder blocked on a full queue
+            try:
+                results.append(_post_event(conn, *item))
+            except Exception as err:
+                log.exception("Event %d could not be sent", item[0])
+                results.append(AlertResult(item[0], 0, str(err) or type(err).__name__))
+    finally:
+        conn.close()
+
+
+def _post_event(
+    conn: HTTPSConnection, position: int, event: dict[str, Any]
+) -> AlertResult:
+    """
+    Post event on connection, reconnecting once if an idle connection was dropped.
+
+    Other errors are not retried, the event may have been received and events
+    without a dedup_key would open a second alert.
+    """
+    body = json.dumps(event)
+    headers = {"Content-Type": "application/json"}
+    error = ""
+
+    for _ in range(2):
+        # Only a reused keep-alive connection can have been closed by the server
+        reused = conn.sock is not None
+        sent = False
+        try:
+            conn.request("POST", EVENTS_ROUTE, body, headers)
+            sent = True
+            result = conn.getresponse()
+            response = result.read().decode("utf-8", errors="replace")
+            log.debug("Event %d status: %s", position, result.status)
+            return AlertResult(position, result.status, response)
+        except (HTTPException, OSError) as err:
+            conn.close()
+            error = str(err) or type(err).__name__
+            dropped = (
+                isinstance(err, RemoteDisconnected)
+                if sent
+                else isinstance(err, (BrokenPipeError, ConnectionResetError))
+            )
+            if not (reused and dropped):
+                break
+
+    return AlertResult(position, 0, error)
+
+
+class EventSpool:
+    """Durable local queue of events, sent to PagerDuty by a background flusher."""
+
+    def __init__(
+        self,
+        filepath: str,
+        *,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """
+        Durable local queue of events, sent to PagerDuty by a background flusher.
+
+        Events are stored in a SQLite file until PagerDuty accepts them, and
+        survive restarts of the process. Use as a context manager, or call
+        `start` and `stop`, to run the flusher.
+
+        Args
+            filepath: Filename/path of the SQLite spool, created if missing
+            batch_size: Max events sent by one flush
+            interval: Seconds between flushes while the spool is idle
+            max_backoff: Max seconds to wait after PagerDuty rejects a flush
+        """
+        self._batch_size = max(batch_size, 1)
+        self._interval = interval
+        self._max_backoff = max_backoff
+        self._backoff = 0.0
+
+        self._db = sqlite3.connect(filepath, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spool "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._conn: HTTPSConnection | None = None
+        self._closed = False
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> EventSpool:
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def enqueue(self, event: dict[str, Any]) -> str:
+        """
+        Store event for sending. Returns the event's dedup_key.
+
+        A dedup_key is assigned when the event has none, so retries of the
+        event are deduplicated by PagerDuty.
+        """
+        if not event.get("dedup_key"):
+            event = {**event, "dedup_key": uuid.uuid4().hex}
+
+        with self._db_lock:
+            self._db.execute(
+                "INSERT INTO spool (event) VALUES (?)", (json.dumps(event),)
+            )
+            self._db.commit()
+
+        self._wake.set()
+        return event["dedup_key"]
+
+    def pending(self) -> int:
+        """Number of events waiting to be sent."""
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def flush(self) -> int:
+        """
+        Send one batch of stored events, oldest first. Returns events removed.
+
+        Events rejected as invalid (4xx other than 429) are dropped and logged.
+        On 429, 5xx, or network errors the flush stops, the event is kept, and
+        the flusher backs off before trying again.
+        """
+        with self._flush_lock:
+            with self._db_lock:
+                rows = self._db.execute(
+                    "SELECT id, event FROM spool ORDER BY id LIMIT ?",
+                    (self._batch_size,),
+                ).fetchall()
+
+            if not rows:
+                return 0
+
+            conn = self._conn or HTTPSConnection(
+                host=EVENTS_HOST, port=443, timeout=TIMEOUT_SECONDS
+            )
+            self._conn = conn
+
+            removed = 0
+            for row_id, event in rows:
+                result = _post_event(conn, row_id, json.loads(event))
+
+                if result.status == 429 or result.status >= 500 or not result.status:
+                    self._backoff = min(max(self._backoff * 2, 1.0), self._max_backoff)
+                    log.warning(
+                        "Spool flush stopped (%s), retry in %.0f seconds",
+                        result.status or result.response,
+                        self._backoff,
+                    )
+                    break
+
+                if result.ok:
+                    self._backoff = 0.0
+                else:
+                    log.error("Dropped event %d: %s", row_id, result.response)
+
+                with self._db_lock:
+                    self._db.execute("DELETE FROM spool WHERE id = ?", (row_id,))
+                    self._db.commit()
+                removed += 1
 
-    log.info("Alert status: %s", result.status)
-    log.info("Alert response: %s", result.read())
+            return removed
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the background flusher and close the spool file. When flush is true,
+        send what remains first. The spool cannot be used after it is stopped.
+        """
+        if self._closed:
+            return
+
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+        while flush and self.flush():
+            continue
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+        with self._db_lock:
+            self._db.close()
+        self._closed = True
+
+    def _run(self) -> None:
+        """Flush until stopped, waiting between flushes when idle or backing off."""
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                removed = self.flush()
+            except Exception:
+                # Events stay spooled, keep the flusher alive and try again later
+                self._backoff = min(max(self._backoff * 2, 1.0), self._max_backoff)
+                log.exception(
+                    "Spool flush failed, retry in %.0f seconds", self._backoff
+                )
+                removed = 0
+
+            if self._backoff:
+                self._stopping.wait(self._backoff)
+            elif not removed:
+                self._wake.wait(self._interval)
+
+
+class _Window:
+    """Events held for one dedup_key by AlertCoalescer."""
+
+    __slots__ = ("expires", "state", "pending", "suppressed")
+
+    def __init__(self, expires: float, state: tuple[Any, Any]) -> None:
+        self.expires = expires
+        self.state = state
+        self.pending: dict[str, Any] | None = None
+        self.suppressed = 0
+
+
+class AlertCoalescer:
+    """Coalesce bursts of events that share a dedup_key before sending."""
+
+    def __init__(
+        self,
+        send: Callable[[dict[str, Any]], Any],
+        window: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        background: bool = True,
+    ) -> None:
+        """
+        Coalesce bursts of events that share a dedup_key before sending.
+
+        The first event of a dedup_key is sent at once and opens a window. Until
+        the window ends, repeats are suppressed and only the latest event that
+        changes the state (event_action and severity) is held. The held event
+        is sent when the window ends. Events without a dedup_key are always sent.
+
+        A background timer sends held events as their window ends. It runs only
+        while windows are open. Call `close` at exit to send what is held.
+
+        Args
+            send: Called with one event at a time, e.g. `EventSpool.enqueue`. Not
+                `send_alerts`, which takes an iterable of events
+            window: Seconds events of a dedup_key are coalesced for
+            clock: Source of seconds, monotonic time by default
+            background: When false, no timer runs and windows only end on
+                `submit`, `flush`, and `close`
+        """
+        self._send = send
+        self._window = window
+        self._clock = clock
+        self._windows: dict[str, _Window] = {}
+        self._expiries: deque[tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+        self._background = background
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self.stats: Counter[str] = Counter()
+
+    def submit(self, event: dict[str, Any]) -> bool:
+        """Submit an event. Returns true when the event was forwarded now."""
+        now = self._clock()
+        to_send = self._expire(now)
+        key = event.get("dedup_key")
+        state = self._state(event)
+
+        with self._lock:
+            self.stats["received"] += 1
+            window = self._windows.get(key) if key else None
+
+            if window is not None:
+                # A held change is discarded when replaced by a later event
+                discarded = 1 if window.pending is not None else 0
+                if state == window.state:
+                    window.pending = None
+                    discarded += 1
+                else:
+                    window.pending = event
+                window.suppressed += discarded
+                self.stats["suppressed"] += discarded
+
+            elif key:
+                self._windows[key] = _Window(now + self._window, state)
+                self._expiries.append((now + self._window, key))
+                # The timer exits once no windows are open, restart it
+                if self._background and self._thread is None and not self._closed:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+        if window is None:
+            to_send.append(event)
+        self._forward(to_send)
+        return window is None
+
+    def flush(self) -> int:
+        """Send held events of ended windows. Returns events sent."""
+        to_send = self._expire(self._clock())
+        self._forward(to_send)
+        return len(to_send)
+
+    def close(self) -> int:
+        """Stop the timer, end all windows and send held events. Returns events sent."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        to_send = self._expire(float("inf"))
+        self._forward(to_send)
+        return len(to_send)
+
+    @staticmethod
+    def _state(event: dict[str, Any]) -> tuple[Any, Any]:
+        """State of the alert an event represents."""
+        payload = event.get("payload") or {}
+        return event.get("event_action"), payload.get("severity")
+
+    def _expire(self, now: float) -> list[dict[str, Any]]:
+        """End windows expired by given time, returning held events to send."""
+        to_send: list[dict[str, Any]] = []
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                _, key = self._expiries.popleft()
+                window = self._windows.pop(key)
+
+                if window.suppressed:
+                    log.info("Suppressed %d events of %s", window.suppressed, key)
+                if window.pending is not None:
+                    to_send.append(window.pending)
+        return to_send
+
+    def _forward(self, events: list[dict[str, Any]]) -> None:
+        """Send events outside of the lock."""
+        with self._lock:
+            self.stats["forwarded"] += len(events)
+        for event in events:
+            self._send(event)
+
+    def _run(self) -> None:
+        """Send held events as windows end, until none are open or closed."""
+        while True:
+            with self._lock:
+                if self._closed or not self._expiries:
+                    self._thread = None
+                    return
+                delay = self._expiries[0][0] - self._clock()
+
+            if delay > 0:
+                self._wake.wait(delay)
+                continue
+
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Coalescer failed to send held events")
+
+
+def _read_jsonl(
+    infile: IO[str],
+    skipped: list[int] | None = None,
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Yield one event from each non-blank line of JSON Lines input.
+
+    Lines that are not a JSON object are logged and skipped, their line numbers
+    are added to `skipped` when given.
+    """
+    for line_num, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError as err:
+            event = err
+        if not isinstance(event, dict):
+            log.error("Skipping line %d, not a JSON object: %s", line_num, event)
+            if skipped is not None:
+                skipped.append(line_num)
+            continue
+        yield event
+
+
+def jsonl_handler(source: str, routing_key: str | None = None) -> int:
+    """
+    Send events read as JSON Lines from a file, or stdin when source is "-".
+
+    Args
+        source: Filename/path of JSON Lines events or "-" for stdin
+        routing_key: Routing key used for events that do not carry one
+
+    Returns
+        0 when all lines were sent and accepted, otherwise 1
+    """
+
+    def fill(events: Iterable[dict[str, Any]]) -> Generator[dict[str, Any], None, None]:
+        for event in events:
+            if routing_key and not event.get("routing_key"):
+                event["routing_key"] = routing_key
+            yield event
+
+    skipped: list[int] = []
+    if source == "-":
+        results = send_alerts(fill(_read_jsonl(sys.stdin, skipped)))
+    else:
+        with open(source, encoding="utf-8") as infile:
+            results = send_alerts(fill(_read_jsonl(infile, skipped)))
+
+    for result in results:
+        if not result.ok:
+            log.error(
+                "Event %d failed: %s %s",
+                result.position,
+                result.status,
+                result.response,
+            )
+
+    return 0 if not skipped and all(result.ok for result in results) else 1
 
 
 def console_handler() -> int:
     """For CLI use."""
     logging.basicConfig(level="INFO")
+    if len(sys.argv) > 1 and sys.argv[1] == "--jsonl":
+        if 3 > len(sys.argv) or len(sys.argv) > 4:
+            print('Use: python -m pd_alert --jsonl [FILE | -] ["Routing Key"]')
+            return 1
+        return jsonl_handler(*sys.argv[2:])
+
     if 4 > len(sys.argv) or len(sys.argv) > 5:
         print(
             'Use: python -m pd_alert "Routing Key" '
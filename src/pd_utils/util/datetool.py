@@ -1,8 +1,22 @@
 from __future__ import annotations
 
+import bisect
+import calendar
+import functools
+import heapq
+from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Sequence
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
+
+# Distinct timestamps remembered by to_epoch, repeats skip parsing
+EPOCH_CACHE_SIZE = 4096
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
 
 
 def to_isotime(date_time: datetime) -> str:
@@ -15,11 +29,29 @@ def to_datetime(isotime: str) -> datetime:
     return datetime.fromisoformat(isotime.rstrip("Z"))
 
 
+@functools.lru_cache(maxsize=EPOCH_CACHE_SIZE)
+def to_epoch(isotime: str) -> int:
+    """
+    Convert PD formated iso time to integer seconds since the unix epoch.
+
+    Results are cached, repeated timestamps are not parsed again.
+
+    Raises:
+        ValueError: When isotime is not an iso formatted time
+    """
+    date_time = to_datetime(isotime)
+    epoch = _EPOCH if date_time.tzinfo is None else _EPOCH_UTC
+    return (date_time - epoch) // _SECOND
+
+
+def from_epoch(epoch: int) -> str:
+    """Convert integer seconds since the unix epoch to PD formated iso time."""
+    return to_isotime(datetime.utcfromtimestamp(epoch))
+
+
 def to_seconds(start: str, end: str) -> int:
     """Find the number of seconds between two PD formated iso times."""
-    start_ = to_datetime(start)
-    end_ = to_datetime(end)
-    return int((end_ - start_).total_seconds())
+    return to_epoch(end) - to_epoch(start)
 
 
 def add_offset(
@@ -31,44 +63,173 @@ def add_offset(
     seconds: int = 0,
 ) -> str:
     """Adjust string time by given amount"""
-    dt = datetime.fromisoformat(isotime.rstrip("Z"))
-    adjusted = dt + timedelta(
-        days=days,
-        hours=hours,
-        minutes=minutes,
-        seconds=seconds,
-    )
-    return to_isotime(adjusted)
+    offset = days * 86_400 + hours * 3_600 + minutes * 60 + seconds
+    return from_epoch(to_epoch(isotime) + offset)
 
 
 def utcnow_isotime() -> str:
     return to_isotime(datetime.utcnow())
 
 
-def _is_gapless(sorted_slots: list[tuple[str, str]]) -> bool:
+def utcnow_epoch() -> int:
+    """Current time as integer seconds since the unix epoch."""
+    return calendar.timegm(datetime.utcnow().utctimetuple())
+
+
+def split_range(start: str, stop: str, days: int) -> list[tuple[str, str]]:
     """
-    Compare (start_time, end_time) PD timestamps, true if no gaps exist.
+    Split range between two PD timestamps into windows no longer than given days.
 
-    NOTE: time_slots must be in desc order
+    Args:
+        start: PD timestamp of range start
+        stop: PD timestamp of range stop
+        days: Maximum length of each window
 
-    This method identifies if there is gaps between time slots but
-    does not assert that a given time range is covered. The first
-    and last time slot provided are assumed covered before and after.
+    Returns:
+        List of (start_time, stop_time) windows in order, empty if start >= stop
     """
-    has_coverage = bool(sorted_slots)
+    if days < 1:
+        raise ValueError("Window days must be at least 1.")
 
-    _, prior_stop = sorted_slots.pop() if has_coverage else ("", "")
-    while sorted_slots:
+    windows: list[tuple[str, str]] = []
+    window_start = start
+    while window_start < stop:
+        window_stop = min(add_offset(window_start, days=days), stop)
+        windows.append((window_start, window_stop))
+        window_start = window_stop
+    return windows
 
-        start, stop = sorted_slots.pop()
 
-        if start > prior_stop:
-            has_coverage = False
-            break
+class IntervalSet:
+    """
+    Immutable set of half-open `[start, stop)` intervals of epoch seconds.
 
-        prior_stop = stop
+    Intervals are kept sorted with overlapping and touching intervals merged.
+    Set operations walk both sets once, O(n + m). Point lookups bisect, O(log n).
+    """
 
-    return has_coverage
+    __slots__ = ("_starts", "_stops")
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()) -> None:
+        """
+        Args:
+            intervals: (start, stop) epoch seconds in any order, empty ones dropped
+        """
+        self._starts, self._stops = _merge(sorted(intervals))
+
+    @classmethod
+    def from_isotimes(cls, intervals: Iterable[tuple[str, str]]) -> IntervalSet:
+        """Build from (start_time, stop_time) PD timestamps in any order."""
+        return cls((to_epoch(start), to_epoch(stop)) for start, stop in intervals)
+
+    @classmethod
+    def _from_sorted(cls, intervals: Iterable[tuple[int, int]]) -> IntervalSet:
+        """Build from intervals already sorted by start, skipping the sort."""
+        interval_set = cls.__new__(cls)
+        interval_set._starts, interval_set._stops = _merge(intervals)
+        return interval_set
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self._starts, self._stops)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, epoch: object) -> bool:
+        if not isinstance(epoch, int):
+            return False
+        idx = bisect.bisect_right(self._starts, epoch) - 1
+        return idx >= 0 and epoch < self._stops[idx]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._starts == other._starts and self._stops == other._stops
+
+    def __hash__(self) -> int:
+        return hash((self._starts, self._stops))
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)})"
+
+    def __or__(self, other: IntervalSet) -> IntervalSet:
+        return self.union(other)
+
+    def __and__(self, other: IntervalSet) -> IntervalSet:
+        return self.intersection(other)
+
+    def __sub__(self, other: IntervalSet) -> IntervalSet:
+        return self.difference(other)
+
+    def covers(self, start: int, stop: int) -> bool:
+        """True when every second of `[start, stop)` is in the set."""
+        if start >= stop:
+            return True
+        idx = bisect.bisect_right(self._starts, start) - 1
+        return idx >= 0 and stop <= self._stops[idx]
+
+    def total_seconds(self) -> int:
+        """Seconds covered by the set."""
+        return sum(self._stops) - sum(self._starts)
+
+    def union(self, other: IntervalSet) -> IntervalSet:
+        """Intervals in either set."""
+        return IntervalSet._from_sorted(heapq.merge(self, other))
+
+    def intersection(self, other: IntervalSet) -> IntervalSet:
+        """Intervals in both sets."""
+        intervals: list[tuple[int, int]] = []
+        left, right = 0, 0
+        while left < len(self._starts) and right < len(other._starts):
+            start = max(self._starts[left], other._starts[right])
+            stop = min(self._stops[left], other._stops[right])
+            if start < stop:
+                intervals.append((start, stop))
+            # Advance whichever ends first, it cannot overlap anything further
+            if self._stops[left] < other._stops[right]:
+                left += 1
+            else:
+                right += 1
+        return IntervalSet._from_sorted(intervals)
+
+    def difference(self, other: IntervalSet) -> IntervalSet:
+        """Intervals in this set but not in other."""
+        if not self._starts:
+            return self
+        return self & other.complement(self._starts[0], self._stops[-1])
+
+    def complement(self, start: int, stop: int) -> IntervalSet:
+        """Gaps of the set within `[start, stop)`."""
+        intervals: list[tuple[int, int]] = []
+        cursor = start
+        for interval_start, interval_stop in self:
+            if interval_stop <= cursor:
+                continue
+            if interval_start >= stop:
+                break
+            if interval_start > cursor:
+                intervals.append((cursor, interval_start))
+            cursor = interval_stop
+        if cursor < stop:
+            intervals.append((cursor, stop))
+        return IntervalSet._from_sorted(intervals)
+
+
+def _merge(
+    intervals: Iterable[tuple[int, int]],
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Merge intervals sorted by start into parallel start and stop tuples."""
+    starts: list[int] = []
+    stops: list[int] = []
+    for start, stop in intervals:
+        if start >= stop:
+            continue
+        if stops and start <= stops[-1]:
+            stops[-1] = max(stops[-1], stop)
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return tuple(starts), tuple(stops)
 
 
 def is_covered(
@@ -84,15 +245,7 @@ def is_covered(
         range_start: PD timestamp of start for range to check
         range_stop: PD timesteamp of stop for range to check
     """
-    # Sort by endtime in reverse
-    sorted_slots = sorted(time_slots, key=lambda x: x[1], reverse=True)
-    # Sort by starttime in reverse
-    sorted_slots = sorted(sorted_slots, key=lambda x: x[0], reverse=True)
-
-    if not _is_gapless(sorted_slots.copy()):
-        return False
-
-    first_start, _ = sorted_slots[-1]
-    _, last_end = sorted_slots[0]
-
-    return first_start <= range_start and range_stop <= last_end
+    coverage = IntervalSet.from_isotimes(time_slots)
+    return bool(coverage) and coverage.covers(
+        to_epoch(range_start), to_epoch(range_stop)
+    )
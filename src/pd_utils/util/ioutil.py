@@ -1,38 +1,357 @@
 from __future__ import annotations
 
 import csv
-from collections.abc import Sequence
+import dataclasses
+import gzip
+import importlib.util
+import itertools
+import json
+import os
+import sys
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from contextlib import AbstractContextManager
+from contextlib import ExitStack
+from contextlib import nullcontext
 from io import StringIO
+from io import TextIOWrapper
 from typing import Any
+from typing import IO
+from typing import NamedTuple
+from typing import TypeVar
 
 from pd_utils.model.base import Base
+from pd_utils.model.base import split_annotation
+from pd_utils.model.base import split_generic
 
+_M = TypeVar("_M", bound=Base)
 
-def to_csv_string(objs: Sequence[Base], fieldnames: list[str] | None = None) -> str:
+_FIELD_CONVERTERS: dict[type[Base], dict[str, Callable[[str], Any]]] = {}
+
+# Rows buffered into each Parquet row group
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+
+def to_csv_string(objs: Iterable[Base], fieldnames: list[str] | None = None) -> str:
     """
     Convert an object to a CSV. All attributes are included by default
 
     Args:
-        objs: Sequence of Base objects to convert
+        objs: Iterable of Base objects to convert
         fieldsnames: Optionally define which keys are used, extra will be ignored
     """
-    if not objs:
-        return ""
-
     csv_file = StringIO()
-    if not fieldnames:
-        fieldnames = list(objs[0].as_dict().keys())
-    dict_writer = csv.DictWriter(
-        csv_file,
-        fieldnames=fieldnames,
-        extrasaction="ignore",
-    )
-    dict_writer.writeheader()
-    dict_writer.writerows([row.as_dict() for row in objs])
-
+    write_csv_stream(csv_file, objs, fieldnames)
     return csv_file.getvalue()
 
 
+def output_filename(name: str, output_format: str, compress: bool = False) -> str:
+    """
+    Filename for the output format, with `.gz` suffix when a compressed text format.
+
+    Raises:
+        ValueError: When the output format is not registered
+    """
+    fmt = get_output_format(output_format)
+    suffix = ".gz" if compress and not fmt.binary else ""
+    return f"{name}.{fmt.extension}{suffix}"
+
+
+def write_stream(
+    target: str | IO[str],
+    objs: Iterable[Base],
+    fieldnames: list[str] | None = None,
+    *,
+    output_format: str = "csv",
+    compress: bool = False,
+) -> int:
+    """
+    Write objects to target in the output format as produced. Returns rows written.
+
+    Args:
+        target: Filename/path to write, "-" for stdout, or an open text handle
+        objs: Iterable of Base objects to convert
+        fieldsnames: Optionally define which keys are used, extra will be ignored
+        output_format: Name of a registered output format (default: csv)
+        compress: When true, compress the output
+
+    Raises:
+        ValueError: When the output format is not registered or cannot use target
+    """
+    fmt = get_output_format(output_format)
+    return fmt.writer(target, objs, fieldnames, compress=compress)
+
+
+def write_csv_stream(
+    target: str | IO[str],
+    objs: Iterable[Base],
+    fieldnames: list[str] | None = None,
+    *,
+    compress: bool = False,
+) -> int:
+    """
+    Write objects to a CSV as they are produced. Returns rows written.
+
+    Only one row is held at a time. A file is only created once the first
+    object arrives and, unless compressed, each row is flushed as written.
+    An empty iterable writes nothing.
+
+    Args:
+        target: Filename/path to write, "-" for stdout, or an open text handle
+        objs: Iterable of Base objects to convert
+        fieldsnames: Optionally define which keys are used, extra will be ignored
+        compress: When true, gzip compress the output. Not valid for handles
+
+    Raises:
+        ValueError: When compress is requested for an open handle
+    """
+    if compress and not isinstance(target, str):
+        raise ValueError("Compression requires a filename/path or '-'.")
+
+    rows = 0
+    dict_writer: csv.DictWriter[str] | None = None
+
+    with ExitStack() as stack:
+        for obj in objs:
+            row = obj.as_row()
+
+            if dict_writer is None:
+                csv_file = stack.enter_context(_open_target(target, compress))
+                dict_writer = csv.DictWriter(
+                    csv_file,
+                    fieldnames=fieldnames or list(row.keys()),
+                    extrasaction="ignore",
+                )
+                dict_writer.writeheader()
+
+            dict_writer.writerow(row)
+            rows += 1
+
+    return rows
+
+
+def _open_target(
+    target: str | IO[str], compress: bool
+) -> AbstractContextManager[IO[str]]:
+    """Open target for writing text. Handles and stdout are left open on exit."""
+    if not isinstance(target, str):
+        return nullcontext(target)
+
+    if target == "-":
+        if not compress:
+            return nullcontext(sys.stdout)
+        # Close the gzip stream to write its trailer but leave stdout open
+        gzip_file = gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb")
+        return TextIOWrapper(gzip_file, encoding="utf-8", newline="")
+
+    if compress:
+        return gzip.open(target, "wt", encoding="utf-8", newline="")
+
+    # Line buffering flushes each row to disk as it is written
+    return open(target, "w", encoding="utf-8", newline="", buffering=1)
+
+
+def write_jsonl_stream(
+    target: str | IO[str],
+    objs: Iterable[Base],
+    fieldnames: list[str] | None = None,
+    *,
+    compress: bool = False,
+) -> int:
+    """
+    Write objects to JSON Lines as they are produced. Returns rows written.
+
+    Values keep their types, lists and nested objects are written as JSON. File
+    handling matches `write_csv_stream`.
+
+    Args:
+        target: Filename/path to write, "-" for stdout, or an open text handle
+        objs: Iterable of Base objects to convert
+        fieldsnames: Optionally define which keys are used, extra will be ignored
+        compress: When true, gzip compress the output. Not valid for handles
+
+    Raises:
+        ValueError: When compress is requested for an open handle
+    """
+    if compress and not isinstance(target, str):
+        raise ValueError("Compression requires a filename/path or '-'.")
+
+    rows = 0
+    jsonl_file: IO[str] | None = None
+
+    with ExitStack() as stack:
+        for obj in objs:
+            if jsonl_file is None:
+                jsonl_file = stack.enter_context(_open_target(target, compress))
+
+            jsonl_file.write(json.dumps(_select(obj.as_row(), fieldnames)) + "\n")
+            rows += 1
+
+    return rows
+
+
+def write_parquet_stream(
+    target: str | IO[str],
+    objs: Iterable[Base],
+    fieldnames: list[str] | None = None,
+    *,
+    compress: bool = False,
+) -> int:
+    """
+    Write objects to Parquet in row groups as produced. Returns rows written.
+
+    Requires `pyarrow`. At most `PARQUET_ROW_GROUP_SIZE` rows are held at a time.
+    Column types come from the field annotations of the first object's model,
+    columns that are not fields are nullable strings. An empty iterable writes
+    nothing.
+
+    Args:
+        target: Filename/path to write or "-" for stdout
+        objs: Iterable of Base objects to convert
+        fieldsnames: Optionally define which keys are used, extra will be ignored
+        compress: When true, gzip compress column pages instead of snappy
+
+    Raises:
+        ValueError: When target is an open text handle or a field annotation has
+            no Parquet type
+    """
+    import pyarrow
+    import pyarrow.parquet
+
+    if not isinstance(target, str):
+        raise ValueError("Parquet requires a filename/path or '-'.")
+
+    sink: Any = sys.stdout.buffer if target == "-" else target
+    rows = 0
+    stream = iter(objs)
+    writer: Any = None
+
+    try:
+        while True:
+            batch = list(itertools.islice(stream, PARQUET_ROW_GROUP_SIZE))
+            if not batch:
+                break
+            records = [_select(obj.as_row(), fieldnames) for obj in batch]
+
+            if writer is None:
+                schema = _parquet_schema(type(batch[0]), list(records[0]))
+                writer = pyarrow.parquet.ParquetWriter(
+                    sink,
+                    schema,
+                    compression="gzip" if compress else "snappy",
+                )
+
+            writer.write_table(pyarrow.Table.from_pylist(records, schema=schema))
+            rows += len(records)
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
+
+
+def _parquet_schema(model: type[Base], columns: list[str]) -> Any:
+    """
+    Build a pyarrow schema of columns from the field annotations of model.
+
+    Raises:
+        ValueError: When a field annotation has no Parquet type
+    """
+    import pyarrow
+
+    annotations = {field.name: field.type for field in dataclasses.fields(model)}
+    fields = []
+    for column in columns:
+        annotation = annotations.get(column, "str | None")
+        try:
+            arrow_type, nullable = _arrow_type(annotation)
+        except KeyError:
+            msg = f"No Parquet type for {model.__name__}.{column}: {annotation}"
+            raise ValueError(msg) from None
+        fields.append(pyarrow.field(column, arrow_type, nullable=nullable))
+    return pyarrow.schema(fields)
+
+
+def _arrow_type(annotation: Any) -> tuple[Any, bool]:
+    """
+    Map a field annotation to a pyarrow type and whether it is nullable.
+
+    Lists, tuples, sets and frozensets become list types of their first member.
+
+    Raises:
+        KeyError: When the annotation has no Parquet type
+    """
+    import pyarrow
+
+    members, nullable = split_annotation(annotation)
+    if len(members) != 1:
+        raise KeyError(annotation)
+
+    name, params = split_generic(members[0])
+    if name in ("list", "tuple", "set", "frozenset") and params:
+        member_type, _ = _arrow_type(params[0])
+        return pyarrow.list_(member_type), nullable
+
+    scalars = {
+        "str": pyarrow.string(),
+        "int": pyarrow.int64(),
+        "float": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+    }
+    return scalars[name], nullable
+
+
+def _select(row: dict[str, Any], fieldnames: list[str] | None) -> dict[str, Any]:
+    """Limit row to fieldnames, in order. Missing keys are None."""
+    if fieldnames is None:
+        return row
+    return {key: row.get(key) for key in fieldnames}
+
+
+class OutputFormat(NamedTuple):
+    """Registered writer of an output format."""
+
+    name: str
+    extension: str
+    writer: Callable[..., int]
+    # Binary formats compress internally and cannot write to text handles
+    binary: bool = False
+
+
+OUTPUT_FORMATS: dict[str, OutputFormat] = {}
+
+
+def register_output_format(fmt: OutputFormat) -> None:
+    """Register an output format, replacing any of the same name."""
+    OUTPUT_FORMATS[fmt.name] = fmt
+
+
+def get_output_format(name: str) -> OutputFormat:
+    """
+    Get a registered output format by name.
+
+    Raises:
+        ValueError: When the output format is not registered
+    """
+    try:
+        return OUTPUT_FORMATS[name]
+    except KeyError:
+        valid = ", ".join(sorted(OUTPUT_FORMATS))
+        msg = f"Unknown output format {name!r}, expected: {valid}"
+        raise ValueError(msg) from None
+
+
+register_output_format(OutputFormat("csv", "csv", write_csv_stream))
+register_output_format(OutputFormat("jsonl", "jsonl", write_jsonl_stream))
+# Parquet is only offered when the optional dependency is installed
+if importlib.util.find_spec("pyarrow") is not None:
+    register_output_format(
+        OutputFormat("parquet", "parquet", write_parquet_stream, binary=True)
+    )
+
+
 def csv_to_dict(csv_string: str) -> list[dict[str, Any]]:
     """Convert a csv string to a list of dictionaries."""
     csv_io = StringIO(csv_string)
@@ -40,6 +359,82 @@ def csv_to_dict(csv_string: str) -> list[dict[str, Any]]:
     return [*dict_reader]
 
 
+def read_csv_models(filepath: str, model: type[_M]) -> Generator[_M, None, None]:
+    """
+    Read a CSV file lazily, yielding one model per row typed by its fields.
+
+    Values are converted by the field's annotation: `int`, `float`, `bool`, and
+    `str`, each optionally `| None`. Empty values become None where the field
+    allows it. Booleans are read from "True"/"False" (any case) or "1"/"0".
+    Columns that do not match a field are ignored.
+
+    Args:
+        filepath: Filename/path to read. File must exist
+        model: Dataclass of Base to build from each row
+
+    Raises:
+        ValueError: When a value cannot be converted to its field's type
+    """
+    converters = _field_converters(model)
+
+    with open(filepath, encoding="utf-8", newline="") as infile:
+        dict_reader = csv.DictReader(infile)
+        for row in dict_reader:
+            values: dict[str, Any] = {}
+            for name, value in row.items():
+                convert = converters.get(name)
+                if convert is None:
+                    continue
+                try:
+                    values[name] = convert(value)
+                except ValueError as err:
+                    msg = f"{filepath} line {dict_reader.line_num}, {name}: {err}"
+                    raise ValueError(msg) from err
+
+            yield model(**values)
+
+
+def _field_converters(model: type[Base]) -> dict[str, Callable[[str], Any]]:
+    """Map each init field of model to a converter from CSV string. Cached."""
+    if model in _FIELD_CONVERTERS:
+        return _FIELD_CONVERTERS[model]
+
+    converters: dict[str, Callable[[str], Any]] = {}
+    for field in dataclasses.fields(model):
+        if not field.init:
+            continue
+        converters[field.name] = _converter(field.type)
+    _FIELD_CONVERTERS[model] = converters
+    return converters
+
+
+def _converter(annotation: Any) -> Callable[[str], Any]:
+    """Build converter from CSV string for a field annotation."""
+    members, optional = split_annotation(annotation)
+    convert = _CONVERTERS.get(members[0], str) if len(members) == 1 else str
+    if not optional:
+        return convert
+    return lambda value: convert(value) if value != "" else None
+
+
+def _to_bool(value: str) -> bool:
+    """Convert CSV string to bool."""
+    lowered = value.strip().lower()
+    if lowered in ("true", "1"):
+        return True
+    if lowered in ("false", "0", ""):
+        return False
+    raise ValueError(f"invalid boolean: {value!r}")
+
+
+_CONVERTERS: dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "float": float,
+    "bool": _to_bool,
+    "str": str,
+}
+
+
 def write_to_file(filepath: str, content: str) -> None:
     """Write string to filename/path. Empty strings are ignored."""
     if not content:
@@ -48,6 +443,14 @@ def write_to_file(filepath: str, content: str) -> None:
         outfile.write(content)
 
 
+def append_to_file(filepath: str, content: str) -> None:
+    """Append string to filename/path, created if missing. Synced to disk on return."""
+    with open(filepath, "a", encoding="utf-8") as outfile:
+        outfile.write(content)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+
+
 def read_from_file(filepath: str) -> str:
     """Read string from filename/path. File must exist."""
     with open(filepath, encoding="utf-8") as infile:
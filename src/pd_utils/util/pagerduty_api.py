@@ -6,6 +6,7 @@ from collections.abc import Generator
 from typing import Any
 
 import httpx
+from pd_utils.util import datetool
 
 
 class PagerDutyAPI:
@@ -13,6 +14,10 @@ class PagerDutyAPI:
 
     log = logging.getLogger(__name__)
     base_url = "https://api.pagerduty.com"
+    # Classic pagination refuses to page past this many objects
+    offset_ceiling = 10_000
+    # Since/until ranges longer than six months are rejected
+    max_range_days = 180
 
     class QueryError(Exception):
         ...
@@ -89,15 +94,35 @@ class PagerDutyAPI:
             more: True if more results remain after offset + limit
             total: # of objects total or 0
         """
+        return self._list(
+            self.route,
+            self.object_name,
+            self._params,
+            offset=offset,
+            limit=limit,
+            total=total,
+        )
+
+    def _list(
+        self,
+        route: str,
+        object_name: str,
+        params: dict[str, Any],
+        *,
+        offset: int = 0,
+        limit: int = 100,
+        total: bool = False,
+    ) -> tuple[list[dict[str, Any]], bool, int]:
+        """Run query against given list endpoint. See `_query` for details."""
         params = {
             "offset": offset,
             "limit": limit,
             "total": total,
-            **self._params,
+            **params,
         }
 
-        self.log.debug("List %s: %s", self._object_name, params)
-        resp = self._http.get(f"{self.base_url}{self.route}", params=params)
+        self.log.debug("List %s: %s", object_name, params)
+        resp = self._http.get(f"{self.base_url}{route}", params=params)
 
         if not resp.is_success:
             self.log.error("Unexpected error: %s", resp.text)
@@ -106,9 +131,9 @@ class PagerDutyAPI:
         more_: bool = resp.json().get("more") or False
         total_: int = resp.json().get("total") or 0
 
-        self.log.debug("Pulled %d objects.", len(resp.json()[self.object_name]))
+        self.log.debug("Pulled %d objects.", len(resp.json()[object_name]))
 
-        return resp.json()[self.object_name], more_, total_
+        return resp.json()[object_name], more_, total_
 
     def query_iter(self, limit: int = 100) -> Generator[dict[str, Any], None, None]:
         """Iterate through responses from PagerDuty API."""
@@ -120,6 +145,153 @@ class PagerDutyAPI:
             offset += limit
             yield from results
 
+    def list_iter(
+        self,
+        route: str,
+        object_name: str,
+        params: dict[str, Any] | None = None,
+        limit: int = 100,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate through responses from a given list endpoint of PagerDuty API.
+
+        Unlike `query_iter`, the query target and params set on this object are
+        neither used nor changed. Safe to interleave with other queries.
+
+        Args:
+            route: Examples: `/schedules` `/users` `/incidents/{id}/log_entries`
+            object_name: Examples: `schedules`, `users`, `log_entries`
+            params: Url fields for query, `None` values are dropped
+            limit: Max results to return per query (Max: 100)
+        """
+        params = {k: v for k, v in params.items() if v is not None} if params else {}
+        more = True
+        offset = 0
+
+        while more:
+            results, more, _ = self._list(
+                route, object_name, params, offset=offset, limit=limit
+            )
+            offset += limit
+            yield from results
+
+    def window_iter(
+        self,
+        route: str,
+        object_name: str,
+        params: dict[str, Any] | None,
+        since: str,
+        until: str,
+        *,
+        limit: int = 100,
+        max_days: int | None = None,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate through a list endpoint by time window, past the offset ceiling.
+
+        Windows holding more objects than `offset_ceiling` are split in half
+        until each can be paged in full. Objects are yielded in window order and
+        objects returned by two adjoining windows are only yielded once. Like
+        `list_iter`, the query target and params set on this object are unused.
+
+        Args:
+            route: Examples: `/incidents` `/log_entries`
+            object_name: Examples: `incidents`, `log_entries`
+            params: Url fields for query, `None` values are dropped
+            since: PD timestamp, start of range
+            until: PD timestamp, end of range
+            limit: Max results to return per query (Max: 100)
+            max_days: Longest window the endpoint accepts, unlimited when None
+        """
+        params = {k: v for k, v in params.items() if v is not None} if params else {}
+        windows = (
+            datetool.split_range(since, until, max_days)
+            if max_days
+            else [(since, until)]
+        )
+        # Windows are popped from the end, keep the earliest last
+        windows.reverse()
+        prior_ids: set[str] = set()
+
+        while windows:
+            window_since, window_until = windows.pop()
+            window_params = {**params, "since": window_since, "until": window_until}
+            results, more, total = self._list(
+                route, object_name, window_params, limit=limit, total=True
+            )
+
+            start = datetool.to_epoch(window_since)
+            stop = datetool.to_epoch(window_until)
+            if total > self.offset_ceiling and stop - start > 1:
+                midpoint = datetool.from_epoch((start + stop) // 2)
+                self.log.debug("Splitting %s window at %s", object_name, midpoint)
+                windows.extend([(midpoint, window_until), (window_since, midpoint)])
+                continue
+
+            window_ids: set[str] = set()
+            offset = limit
+            while True:
+                for result in results:
+                    window_ids.add(result["id"])
+                    if result["id"] not in prior_ids:
+                        yield result
+
+                if not more or offset >= self.offset_ceiling:
+                    break
+
+                results, more, _ = self._list(
+                    route, object_name, window_params, offset=offset, limit=limit
+                )
+                offset += limit
+
+            if more:
+                self.log.warning(
+                    "Offset ceiling reached for %s from %s to %s, results truncated",
+                    object_name,
+                    window_since,
+                    window_until,
+                )
+            prior_ids = window_ids
+
+    def cursor_iter(
+        self,
+        route: str,
+        object_name: str,
+        params: dict[str, Any] | None = None,
+        limit: int = 100,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Iterate through a cursor paginated endpoint of PagerDuty API.
+
+        Cursor pagination has no offset ceiling. Like `list_iter`, the query
+        target and params set on this object are unused.
+
+        Args:
+            route: Examples: `/audit/records` `/users/{id}/audit/records`
+            object_name: Examples: `records`
+            params: Url fields for query, `None` values are dropped
+            limit: Max results to return per query
+        """
+        params = {k: v for k, v in params.items() if v is not None} if params else {}
+        cursor: str | None = None
+
+        while True:
+            page_params = {"limit": limit, **params}
+            page_params.update({"cursor": cursor} if cursor else {})
+
+            self.log.debug("Cursor %s: %s", object_name, page_params)
+            resp = self._http.get(f"{self.base_url}{route}", params=page_params)
+
+            if not resp.is_success:
+                self.log.error("Unexpected error: %s", resp.text)
+                raise self.QueryError("Unexpected error")
+
+            yield from resp.json()[object_name]
+
+            cursor = resp.json().get("next_cursor")
+            if not cursor:
+                break
+
     def get(
         self,
         route: str,
@@ -148,3 +320,36 @@ class PagerDutyAPI:
             return resp.json() if resp.is_success else None
         except json.JSONDecodeError:
             return resp.text if resp.text else None
+
+    def put_bulk(
+        self,
+        route: str,
+        object_name: str,
+        objects: list[dict[str, Any]],
+    ) -> list[dict[str, Any]] | None:
+        """
+        Put a batch of object updates to given route endpoint.
+
+        Args:
+            route: Examples: `/incidents`
+            object_name: Examples: `incidents`
+            objects: Updates to send, each carrying the `id` of its object
+
+        Returns:
+            Objects returned as updated, None on failure
+        """
+        payload = {object_name: objects}
+        try:
+            resp = self._http.put(f"{self.base_url}{route}", json=payload)
+        except httpx.HTTPError as err:
+            self.log.error("Bulk put failed: %s", err)
+            return None
+
+        if not resp.is_success:
+            self.log.error("Bulk put failed: %d, %s", resp.status_code, resp.text)
+            return None
+        try:
+            return resp.json().get(object_name) or []
+        except json.JSONDecodeError:
+            self.log.error("Bulk put returned unexpected response: %s", resp.text)
+            return None
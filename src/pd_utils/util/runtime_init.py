@@ -5,6 +5,7 @@ import argparse
 import logging
 from collections.abc import Sequence
 
+from pd_utils.util import ioutil
 from pd_utils.util.pagerduty_api import PagerDutyAPI
 from secretbox import SecretBox
 from secretbox.envfile_loader import EnvFileLoader
@@ -107,6 +108,21 @@ class RuntimeInit:
                 default=60,
             )
 
+    def add_output_arguments(self) -> None:
+        """Add command line arguments controlling how output files are written."""
+        self.parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="When present, output files are gzip compressed",
+        )
+        self.parser.add_argument(
+            "--format",
+            dest="output_format",
+            choices=sorted(ioutil.OUTPUT_FORMATS),
+            default="csv",
+            help="Format of output files (default: csv). parquet requires pyarrow",
+        )
+
     def parse_args(self, args: Sequence[str] | None = None) -> argparse.Namespace:
         """Parse command line arguments."""
         parsed = (
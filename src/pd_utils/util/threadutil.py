@@ -0,0 +1,49 @@
+"""Helpers for running blocking calls on a thread pool."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def bounded_map(
+    func: Callable[[_T], _R],
+    items: Iterable[_T],
+    workers: int,
+    backlog: int | None = None,
+) -> Generator[tuple[_T, _R], None, None]:
+    """
+    Map func over items on a thread pool, yielding (item, result) in given order.
+
+    Items are pulled lazily and only `backlog` calls are in flight at once, so
+    memory stays flat regardless of how many items are given. Exceptions raised
+    by func are raised when their result is reached.
+
+    Args:
+        func: Callable to run for each item
+        items: Iterable of items, consumed as results are yielded
+        workers: Number of threads to run calls on
+        backlog: Max calls in flight or waiting to be yielded (default: workers * 4)
+    """
+    workers = max(workers, 1)
+    backlog = max(backlog or workers * 4, 1)
+    pending: deque[tuple[_T, Future[_R]]] = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+
+            if len(pending) >= backlog:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+
+        while pending:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
@@ -14,6 +14,7 @@ def test_main_no_optional_args() -> None:
     assert kwargs["close_after_days"] == 10
     assert kwargs["close_active"] is False
     assert kwargs["close_priority"] is False
+    assert kwargs["concurrency"] == 4
 
 
 def test_main_optional_args() -> None:
@@ -28,6 +29,7 @@ def test_main_optional_args() -> None:
                 "--close-active",
                 "--close-priority",
                 "--close-after-days=5",
+                "--concurrency=12",
             ]
         )
         kwargs = mockclass.call_args.kwargs
@@ -35,3 +37,15 @@ def test_main_optional_args() -> None:
     assert kwargs["close_after_days"] == 5
     assert kwargs["close_active"] is True
     assert kwargs["close_priority"] is True
+    assert kwargs["concurrency"] == 12
+
+
+def test_main_resume() -> None:
+
+    with patch.object(close_old_incidents_cli, "CloseOldIncidents") as mockclass:
+        close_old_incidents_cli.main(["--inputfile", "mock.csv", "--resume"])
+        run_call = mockclass.return_value.run.call_args
+
+    assert run_call.args == ("mock.csv",)
+    assert run_call.kwargs["resume"] is True
+    assert run_call.kwargs["output_format"] == "csv"
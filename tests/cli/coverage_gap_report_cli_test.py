@@ -7,9 +7,11 @@ from pd_utils.cli import coverage_gap_report_cli
 
 def test_main() -> None:
     with patch.object(
-        coverage_gap_report_cli.CoverageGapReport, "run_reports"
+        coverage_gap_report_cli.CoverageGapReport, "write_reports"
     ) as mocked:
-        mocked.return_value = ("", "")
-        coverage_gap_report_cli.main(_args=[])
+        mocked.return_value = (0, 0)
+        coverage_gap_report_cli.main(_args=["--gzip"])
 
         mocked.assert_called_once()
+        assert mocked.call_args.args[0].endswith(".csv.gz")
+        assert mocked.call_args.kwargs["compress"] is True
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from pd_utils.cli import incident_export_cli
+
+
+def test_main_no_optional_args() -> None:
+
+    with patch.object(incident_export_cli, "IncidentExport") as mockclass:
+        incident_export_cli.main(["--token", "mock"])
+        kwargs = mockclass.call_args.kwargs
+        run_call = mockclass.return_value.run.call_args
+
+    since, until = run_call.args
+    assert kwargs["shard_days"] == 7
+    assert kwargs["concurrency"] == 4
+    assert since < until
+    assert run_call.kwargs["summary"] is False
+    assert run_call.kwargs["compress"] is False
+
+
+def test_main_optional_args() -> None:
+
+    with patch.object(incident_export_cli, "IncidentExport") as mockclass:
+        incident_export_cli.main(
+            [
+                "--token",
+                "mock",
+                "--since=2022-08-01T00:00:00Z",
+                "--until=2022-09-01T00:00:00Z",
+                "--shard-days=1",
+                "--concurrency=8",
+                "--summary",
+                "--gzip",
+            ]
+        )
+        kwargs = mockclass.call_args.kwargs
+        run_call = mockclass.return_value.run.call_args
+
+    assert kwargs["shard_days"] == 1
+    assert kwargs["concurrency"] == 8
+    assert run_call.args == ("2022-08-01T00:00:00Z", "2022-09-01T00:00:00Z")
+    assert run_call.kwargs["summary"] is True
+    assert run_call.kwargs["compress"] is True
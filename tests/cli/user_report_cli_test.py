@@ -8,10 +8,67 @@ from pd_utils.cli import user_report_cli
 def test_main() -> None:
 
     with patch.object(
-        user_report_cli.UserReport, "run_report", return_value=""
+        user_report_cli.UserReport, "write_report", return_value=0
     ) as mock:
 
         result = user_report_cli.main([])
 
         assert mock.call_count == 1
+        assert mock.call_args.args[0].endswith(".csv")
+        assert mock.call_args.kwargs["compress"] is False
         assert result == 0
+
+
+def test_main_gzip() -> None:
+
+    with patch.object(
+        user_report_cli.UserReport, "write_report", return_value=0
+    ) as mock:
+
+        user_report_cli.main(["--gzip"])
+
+        assert mock.call_args.args[0].endswith(".csv.gz")
+        assert mock.call_args.kwargs["compress"] is True
+
+
+def test_main_format() -> None:
+
+    with patch.object(
+        user_report_cli.UserReport, "write_report", return_value=0
+    ) as mock:
+
+        user_report_cli.main(["--format", "jsonl", "--gzip"])
+
+        assert mock.call_args.args[0].endswith(".jsonl.gz")
+        assert mock.call_args.kwargs["output_format"] == "jsonl"
+
+
+def test_main_columns() -> None:
+
+    with patch.object(
+        user_report_cli.UserReport, "write_report", return_value=0
+    ) as mock:
+
+        user_report_cli.main(["--columns", "id", "email"])
+
+        assert mock.call_args.kwargs["columns"] == ["id", "email"]
+
+
+def test_main_delta_index(mock_filename: str) -> None:
+    with open(mock_filename, "w") as outfile:
+        outfile.write('{"PSIUGWW": "abc"}')
+    resp = {"PSIUGWW": "def"}
+
+    with patch.object(
+        user_report_cli.UserReport, "write_delta_report", return_value=resp
+    ) as mock:
+
+        result = user_report_cli.main(["--delta-index", mock_filename])
+
+    with open(mock_filename) as infile:
+        saved = infile.read()
+
+    assert result == 0
+    assert mock.call_args.kwargs["previous_index"] == {"PSIUGWW": "abc"}
+    assert saved == '{"PSIUGWW": "def"}'
+    assert mock.call_args.kwargs["snapshot_target"] is None
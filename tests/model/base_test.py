@@ -4,6 +4,9 @@ import dataclasses
 
 import pytest
 from pd_utils.model.base import Base
+from pd_utils.model.base import slotted
+from pd_utils.model.base import split_annotation
+from pd_utils.model.base import split_generic
 
 
 @pytest.fixture
@@ -25,3 +28,92 @@ def test_as_json(model: Base) -> None:
 
 def test_str(model: Base) -> None:
     assert str(model) == '{"test": "Test"}'
+
+
+@dataclasses.dataclass
+class MockNested(Base):
+    name: str
+    tags: list[str]
+    pairs: tuple[tuple[str, str], ...]
+    child: MockNested | None = None
+
+
+@pytest.fixture
+def nested() -> MockNested:
+    child = MockNested("child", ["c"], ())
+    return MockNested("parent", ["a", "b"], (("x", "y"),), child)
+
+
+def test_as_dict_matches_asdict(nested: MockNested) -> None:
+    assert nested.as_dict() == dataclasses.asdict(nested)
+
+
+def test_as_dict_copies_mutable_values(nested: MockNested) -> None:
+    result = nested.as_dict()
+    result["tags"].append("z")
+
+    assert nested.tags == ["a", "b"]
+    assert isinstance(result["child"], dict)
+    assert result["pairs"] is nested.pairs
+
+
+def test_as_row_shares_values(nested: MockNested) -> None:
+    result = nested.as_row()
+
+    assert list(result) == ["name", "tags", "pairs", "child"]
+    assert result["tags"] is nested.tags
+    assert result["child"] is nested.child
+
+
+@slotted
+@dataclasses.dataclass
+class MockSlotted(Base):
+    __slots__ = ("extra",)
+
+    name: str
+    tags: list[str] = dataclasses.field(default_factory=list)
+    count: int = 0
+
+
+@slotted
+@dataclasses.dataclass
+class MockSlottedChild(MockSlotted):
+    label: str = ""
+
+
+def test_slotted() -> None:
+    model = MockSlottedChild("test", label="child")
+    model.extra = "set"  # type: ignore
+
+    assert not hasattr(model, "__dict__")
+    assert MockSlotted.__slots__ == ("extra", "name", "tags", "count")
+    assert MockSlottedChild.__slots__ == ("label",)
+    assert model.as_dict() == {"name": "test", "tags": [], "count": 0, "label": "child"}
+    with pytest.raises(AttributeError):
+        model.unknown = True  # type: ignore
+
+
+@pytest.mark.parametrize(
+    ("annotation", "expected"),
+    (
+        ("str", (["str"], False)),
+        (int, (["int"], False)),
+        ("str | None", (["str"], True)),
+        ("dict[str, int | None] | None", (["dict[str, int | None]"], True)),
+        ("int | str", (["int", "str"], False)),
+    ),
+)
+def test_split_annotation(annotation: object, expected: tuple[list[str], bool]) -> None:
+    assert split_annotation(annotation) == expected
+
+
+@pytest.mark.parametrize(
+    ("member", "expected"),
+    (
+        ("str", ("str", [])),
+        ("tuple[str, ...]", ("tuple", ["str", "..."])),
+        ("dict[str, list[int]]", ("dict", ["str", "list[int]"])),
+    ),
+)
+def test_split_generic(member: str, expected: tuple[str, list[str]]) -> None:
+    assert split_generic(member) == expected
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from pd_utils.model import ContactProfile
+from pd_utils.model.contact_profile import method_kind
+
+USER = Path("tests/fixture/user_report/user.json").read_text()
+
+
+def test_model() -> None:
+    resp = json.loads(USER)
+
+    model = ContactProfile.build_from(resp)
+
+    assert model.contact_types == {
+        "email_contact_method",
+        "phone_contact_method",
+        "sms_contact_method",
+    }
+    assert model.has_blocked is True
+    assert model.get_delay("high", "email") == ["0"]
+    assert model.get_delay("high", "phone") == ["2", "4"]
+    assert model.get_delay("low", "sms") == ["5"]
+    assert model.get_delay("low", "push") is None
+
+
+def test_model_empty() -> None:
+    resp = {"contact_methods": None, "notification_rules": None}
+
+    model = ContactProfile.build_from(resp)
+
+    assert model.contact_types == frozenset()
+    assert model.has_blocked is False
+    assert model.delays == {}
+
+
+@pytest.mark.parametrize(
+    ("type_", "expected"),
+    (
+        ("email_contact_method", "email"),
+        ("push_notification_contact_method_reference", "push"),
+        ("sms_contact_method", "sms"),
+        ("phone_contact_method", "phone"),
+        ("carrier_pigeon_contact_method", None),
+    ),
+)
+def test_method_kind(type_: str, expected: str | None) -> None:
+    assert method_kind(type_) == expected
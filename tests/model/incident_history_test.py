@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from pd_utils.model import IncidentHistory
+from pd_utils.model import IncidentMetrics
+
+INCIDENTS = Path("tests/fixture/close-incidents/incidents.json").read_text()
+
+
+def test_model() -> None:
+    resp = json.loads(INCIDENTS)[0]["incidents"][0]
+
+    model = IncidentHistory.build_from(resp)
+
+    assert model.incident_number == 3
+    assert model.service_id == "PIF0WEL"
+    assert model.service_name == "Testing service"
+    assert model.priority == ""
+    assert model.acknowledged_at == "2022-08-01T02:39:15Z"
+    assert model.resolved_at == ""
+    assert model.seconds_to_ack == 50
+    assert model.seconds_to_resolve is None
+
+
+def test_model_resolved() -> None:
+    resp = json.loads(INCIDENTS)[0]["incidents"][0]
+    resp["status"] = "resolved"
+    resp["acknowledgements"] = []
+    resp["last_status_change_at"] = "2022-08-01T03:38:25Z"
+
+    model = IncidentHistory.build_from(resp)
+
+    assert model.acknowledged_at == ""
+    assert model.resolved_at == "2022-08-01T03:38:25Z"
+    assert model.seconds_to_ack is None
+    assert model.seconds_to_resolve == 3600
+
+
+def test_model_resolved_first_ack() -> None:
+    resp = json.loads(INCIDENTS)[0]["incidents"][0]
+    resp["status"] = "resolved"
+    resp["acknowledgements"] = []
+    resp["last_status_change_at"] = "2022-08-01T03:38:25Z"
+
+    model = IncidentHistory.build_from(resp, "2022-08-01T02:40:25Z")
+
+    assert model.acknowledged_at == "2022-08-01T02:40:25Z"
+    assert model.seconds_to_ack == 120
+
+
+def test_metrics() -> None:
+    resp = json.loads(INCIDENTS)[0]["incidents"][0]
+    rows = [IncidentHistory.build_from(resp) for _ in range(3)]
+    rows[0].seconds_to_ack = 20
+    rows[1].seconds_to_resolve = 100
+    rows[2].seconds_to_ack = None
+    metrics = IncidentMetrics()
+
+    for row in rows:
+        metrics.add(row)
+
+    assert metrics.incidents == 3
+    assert metrics.acknowledged == 2
+    assert metrics.resolved == 1
+    assert metrics.mean_seconds_to_ack == 35
+    assert metrics.mean_seconds_to_resolve == 100
+
+
+def test_metrics_empty() -> None:
+    metrics = IncidentMetrics()
+
+    assert metrics.mean_seconds_to_ack is None
+    assert metrics.mean_seconds_to_resolve is None
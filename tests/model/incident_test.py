@@ -20,3 +20,13 @@ def test_model() -> None:
     assert model.last_status_change_at == "2022-08-01T02:39:15Z"
     assert model.has_priority is False
     assert model.urgency == "high"
+    assert model.created_epoch == 1659321505
+
+
+def test_model_is_slotted_and_interned() -> None:
+    first = Incident.build_from(json.loads(SCHEDULE)[0]["incidents"][0])
+    second = Incident.build_from(json.loads(SCHEDULE)[0]["incidents"][0])
+
+    assert not hasattr(first, "__dict__")
+    assert first.status is second.status
+    assert first.urgency is second.urgency
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from io import StringIO
 from pathlib import Path
 from unittest.mock import patch
 
@@ -8,6 +9,7 @@ import pytest
 from pd_utils.model import ScheduleCoverage
 from pd_utils.model.escalation_rule_coverage import EscalationRuleCoverage
 from pd_utils.report.coverage_gap_report import CoverageGapReport
+from pd_utils.util import datetool
 from pd_utils.util.pagerduty_api import PagerDutyAPI
 
 SCHEDULES_RESP = Path("tests/fixture/cov_gap/schedule_list.json").read_text()
@@ -160,8 +162,41 @@ def test_hydrate_escalation_coverage_flags(mapped_search: CoverageGapReport) ->
     assert mapped_search._escalation_map["mock3"].is_fully_covered is False
 
 
+def test_map_coverages_rebuilds_schedule_intervals(
+    mapped_search: CoverageGapReport,
+) -> None:
+    full = datetool.IntervalSet.from_isotimes(
+        [("2022-07-29T00:00:00Z", "2022-08-02T00:00:00Z")]
+    )
+    mapped_search._schedule_intervals = {"sch2": full}
+
+    with patch.object(mapped_search, "_get_all_schedule_ids"):
+        with patch.object(mapped_search, "_get_all_escalations"):
+            with patch.object(mapped_search, "_map_schedule_coverages"):
+                with patch.object(mapped_search, "_map_escalation_coverages"):
+                    mapped_search._map_coverages()
+
+    assert mapped_search._escalation_map["mock1"].is_fully_covered is False
+    assert mapped_search._schedule_intervals["sch2"] != full
+
+
 def test_run_clean_exits_no_work(search: CoverageGapReport) -> None:
     resp_gen = []  # type: ignore
 
     with patch.object(search._query, "query_iter", return_value=resp_gen):
         search.run_reports()
+
+
+def test_write_reports(mapped_search: CoverageGapReport) -> None:
+    schedule = StringIO()
+    escalation = StringIO()
+
+    with patch.object(mapped_search, "_map_coverages"):
+        result = mapped_search.write_reports(schedule, escalation)
+
+    assert result == (
+        len(mapped_search._schedule_map),
+        len(mapped_search._escalation_map),
+    )
+    assert schedule.getvalue().startswith("pd_id,")
+    assert escalation.getvalue().startswith("policy_id,")
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Generator
 from contextlib import redirect_stdout
 from io import StringIO
 from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
@@ -18,6 +20,22 @@ EXPECTED_US_IPS = set(json.loads(US_SAMPLE))
 EXPECTED_EU_IPS = set(json.loads(EU_SAMPLE))
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(pdip, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def mock_conn() -> Generator[MagicMock, None, None]:
+    resp = MagicMock(status=200, read=MagicMock(return_value=US_SAMPLE.encode()))
+    resp.getheader.side_effect = {"ETag": '"v1"', "Last-Modified": "mock"}.get
+    conn = MagicMock()
+    conn.return_value.getresponse.return_value = resp
+    with patch.object(pdip, "HTTPSConnection", conn):
+        yield conn
+
+
 @pytest.mark.parametrize(
     ("url", "route", "expected"),
     (
@@ -80,3 +98,106 @@ def test_console_out() -> None:
 
     assert result == 0
     assert len(clean_capture - expected) == 0
+
+
+def test_url_page_caches(mock_conn: MagicMock) -> None:
+    first = pdip._get_url_page("mock.com", "/ips")
+    second = pdip._get_url_page("mock.com", "ips")
+
+    assert first == second == US_SAMPLE
+    assert mock_conn.return_value.request.call_count == 1
+    mock_conn.return_value.close.assert_called_once()
+
+
+def test_url_page_revalidates_stale(
+    mock_conn: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pdip._get_url_page("mock.com", "/ips")
+    monkeypatch.setattr(pdip, "CACHE_TTL_SECONDS", 0)
+    mock_conn.return_value.getresponse.return_value.status = 304
+    mock_conn.return_value.getresponse.return_value.read.return_value = b""
+
+    result = pdip._get_url_page("mock.com", "/ips")
+    headers = mock_conn.return_value.request.call_args.kwargs["headers"]
+
+    assert result == US_SAMPLE
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "mock"}
+
+
+@pytest.mark.parametrize(
+    ("effect", "status"),
+    (
+        (None, 500),
+        (OSError("unreachable"), 200),
+    ),
+)
+def test_url_page_falls_back_to_cache(
+    mock_conn: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+    effect: Exception | None,
+    status: int,
+) -> None:
+    pdip._get_url_page("mock.com", "/ips")
+    monkeypatch.setattr(pdip, "CACHE_TTL_SECONDS", 0)
+    mock_conn.return_value.getresponse.return_value.status = status
+    mock_conn.return_value.request.side_effect = effect
+
+    result = pdip._get_url_page("mock.com", "/ips")
+
+    assert result == US_SAMPLE
+
+
+def test_url_page_failure_without_cache(mock_conn: MagicMock) -> None:
+    mock_conn.return_value.request.side_effect = OSError("unreachable")
+
+    result = pdip._get_url_page("mock.com", "/ips")
+
+    assert result == ""
+
+
+def test_safelist_matcher() -> None:
+    matcher = pdip.SafelistMatcher(
+        [
+            "10.0.0.1",
+            "10.0.0.2",
+            "10.0.0.3",
+            "192.168.1.0/24",
+            "192.168.0.0/24",
+            "172.16.0.5/30",
+            "2001:db8::/64",
+            "not an ip",
+        ]
+    )
+
+    assert len(matcher) == 4
+    assert matcher.matches("10.0.0.2")
+    assert matcher.matches("10.0.0.3")
+    assert not matcher.matches("10.0.0.4")
+    assert not matcher.matches("10.0.0.0")
+    assert matcher.matches("192.168.0.0")
+    assert matcher.matches("192.168.1.255")
+    assert not matcher.matches("192.168.2.0")
+    assert matcher.matches("172.16.0.7")
+    assert matcher.matches("2001:db8::1")
+    assert not matcher.matches("2001:db9::1")
+    assert matcher.matches("::ffff:10.0.0.1")
+    assert not matcher.matches("1.1.1.1")
+    assert not matcher.matches("not an ip")
+    assert "10.0.0.1" in matcher
+    assert 10 not in matcher
+
+
+def test_safelist_matcher_empty() -> None:
+    matcher = pdip.SafelistMatcher([])
+
+    assert len(matcher) == 0
+    assert not matcher.matches("10.0.0.1")
+    assert not matcher.matches("::1")
+
+
+def test_safelist_matcher_from_safelist() -> None:
+    with patch.object(pdip, "_get_url_page", side_effect=[US_SAMPLE, EU_SAMPLE]):
+        matcher = pdip.SafelistMatcher.from_safelist()
+
+    assert all(matcher.matches(ip) for ip in EXPECTED_US_IPS | EXPECTED_EU_IPS)
@@ -1,22 +1,21 @@
 from __future__ import annotations
 
 import json
+from io import StringIO
 from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
 import pytest
 from pd_utils.model import UserReportRow
-from pd_utils.model import UserTeam
-from pd_utils.report.user_report import _Team
 from pd_utils.report.user_report import UserReport
 from pd_utils.util.pagerduty_api import PagerDutyAPI
 
 USER = Path("tests/fixture/user_report/user.json").read_text()
 MEMBERS = Path("tests/fixture/user_report/members.json").read_text()
 EXPECTED_TEAMS = {
-    _Team("Egg Carton", "PLNRGGS"),
-    _Team("Eggmins", "PHB3G42"),
+    "PLNRGGS": "Egg Carton",
+    "PHB3G42": "Eggmins",
 }
 SCHEDULES = Path("tests/fixture/user_report/schedules.json").read_text()
 EXPECTED_USERS = {"PSIUGWW", "PSIUGWX"}
@@ -28,28 +27,55 @@ def report() -> UserReport:
 
 
 def test_run_report(report: UserReport) -> None:
-    with patch.object(report, "_get_users_and_teams", return_value=(dict(), set())):
+    with patch.object(report, "_get_users_and_teams", return_value=(dict(), dict())):
         with patch.object(report, "_get_users_on_schedules", return_value=set()):
             result = report.run_report()
 
     assert result == ""
 
 
+def test_run_report_pruned_columns(report: UserReport) -> None:
+    user_map = {"PSIUGWW": UserReportRow.build_from(json.loads(USER))}
+    with patch.object(
+        report, "_get_users_and_teams", return_value=(user_map, dict())
+    ) as users:
+        with patch.object(report, "_get_team_memberships") as memberships:
+            with patch.object(report, "_get_users_on_schedules") as schedules:
+                result = report.run_report(columns=["id", "email"])
+
+    assert result == "id,email\r\nPSIUGWW,preocts@preocts.com\r\n"
+    assert users.call_args.args[1] == ()
+    memberships.assert_not_called()
+    schedules.assert_not_called()
+
+
 @pytest.mark.parametrize(
-    ("teams", "expected"),
+    ("columns", "includes", "memberships", "schedules"),
     (
-        (json.loads(USER)["teams"], EXPECTED_TEAMS),
-        (None, set()),
+        (None, ("notification_rules", "contact_methods"), True, True),
+        (["id", "manager_in"], (), True, False),
+        (["on_schedule"], (), False, True),
+        (["has_sms"], ("contact_methods",), False, False),
+        (["low_urgency_sms_delay"], ("notification_rules",), False, False),
     ),
 )
-def test_extract_team_ids(
+def test_plan_report(
     report: UserReport,
-    teams: list[dict[str, Any]] | None,
-    expected: set[str],
+    columns: list[str] | None,
+    includes: tuple[str, ...],
+    memberships: bool,
+    schedules: bool,
 ) -> None:
-    result = report._extract_teams(teams)
+    plan = report._plan_report(columns)
+
+    assert plan.includes == includes
+    assert plan.pull_memberships is memberships
+    assert plan.pull_schedules is schedules
 
-    assert result == expected
+
+def test_plan_report_unknown_column(report: UserReport) -> None:
+    with pytest.raises(ValueError):
+        report._plan_report(["id", "favorite_color"])
 
 
 @pytest.mark.parametrize(
@@ -70,25 +96,62 @@ def test_get_users_and_teams(
     assert len(user_map) == expected_len
 
 
+@pytest.mark.parametrize(
+    ("teams", "expected"),
+    (
+        (json.loads(USER)["teams"], EXPECTED_TEAMS),
+        (None, {}),
+    ),
+)
+def test_get_users_and_teams_team_index(
+    report: UserReport,
+    teams: list[dict[str, Any]] | None,
+    expected: dict[str, str],
+) -> None:
+    resp = json.loads(USER)
+    resp["teams"] = teams
+
+    with patch.object(report._query, "query_iter", return_value=[resp, resp]):
+        _, team_index = report._get_users_and_teams()
+
+    assert team_index == expected
+
+
+def test_get_users_and_teams_without_includes(report: UserReport) -> None:
+    resp = json.loads(USER)
+    resp["notification_rules"] = [{"id": "PPKK9PN", "type": "reference"}]
+
+    with patch.object(report._query, "query_iter", return_value=[resp]):
+        user_map, _ = report._get_users_and_teams(includes=())
+
+    assert "include[]" not in report._query._params
+    assert user_map["PSIUGWW"].high_urgency_email_delay is None
+    assert user_map["PSIUGWW"].has_email is False
+
+
 def test_get_team_memberships(report: UserReport) -> None:
     resp = [json.loads(MEMBERS)]
 
     with patch.object(report._query, "query_iter", return_value=resp):
 
         result = report._get_team_memberships(EXPECTED_TEAMS)
-    print(result)
-    assert len(result) == len(EXPECTED_TEAMS)
+
+    assert result == {
+        "PSIUGWW": {"manager": ["Egg Carton, PLNRGGS", "Eggmins, PHB3G42"]},
+    }
 
 
 def test_hydrate_team_membership(report: UserReport) -> None:
     mock_map = {"PSIUGWW": UserReportRow.build_from(json.loads(USER))}
-    mock_teams = [
-        UserTeam("PSIUGWW", "PLNRGGS", "Egg Carton", "responder"),
-        UserTeam("PSIUGWW", "PLNRGGS", "Eggmins", "responder"),
-        UserTeam("PSIUGWW", "PLNRGGS", "Bonus Hunt", "observer"),
-    ]
+    mock_memberships = {
+        "PSIUGWW": {
+            "responder": ["Egg Carton, PLNRGGS", "Eggmins, PLNRGGS"],
+            "observer": ["Bonus Hunt, PLNRGGS"],
+        },
+        "PNOTUSR": {"manager": ["Egg Carton, PLNRGGS"]},
+    }
 
-    report._hydrate_team_membership(mock_map, mock_teams)
+    report._hydrate_team_membership(mock_map, mock_memberships)
 
     assert mock_map["PSIUGWW"].responder_in
     assert mock_map["PSIUGWW"].observer_in
@@ -118,3 +181,90 @@ def test_hydrate_on_schedule_flag(report: UserReport) -> None:
 
     assert mock_map["PSIUGWW"].on_schedule is True
     assert mock_map["PSIUGWX"].on_schedule is False
+
+
+def test_run_delta_report(report: UserReport) -> None:
+    user = UserReportRow.build_from(json.loads(USER))
+    user_map = {"PSIUGWW": user}
+    columns = ["id", "email"]
+
+    with patch.object(report, "_get_users_and_teams", return_value=(user_map, {})):
+        first, snapshot, index = report.run_delta_report({}, columns=columns)
+        second, _, second_index = report.run_delta_report(index, columns=columns)
+
+    assert first == "change_type,id,email\r\nadded,PSIUGWW,preocts@preocts.com\r\n"
+    assert snapshot == ""
+    assert second == ""
+    assert second_index == index
+
+
+def test_run_delta_report_changed_and_removed(report: UserReport) -> None:
+    user = UserReportRow.build_from(json.loads(USER))
+    user_map = {"PSIUGWW": user}
+    previous = {"PSIUGWW": "0000000000000000", "PGONE01": "0000000000000000"}
+    expected = (
+        "change_type,id,email\r\n"
+        "changed,PSIUGWW,preocts@preocts.com\r\n"
+        "removed,PGONE01,\r\n"
+    )
+
+    with patch.object(report, "_get_users_and_teams", return_value=(user_map, {})):
+        delta, snapshot, index = report.run_delta_report(
+            previous,
+            columns=["id", "email"],
+            snapshot=True,
+        )
+
+    assert delta == expected
+    assert snapshot == "id,email\r\nPSIUGWW,preocts@preocts.com\r\n"
+    assert list(index) == ["PSIUGWW"]
+
+
+def test_write_delta_report_removed_rows_blank(report: UserReport) -> None:
+    delta = StringIO()
+
+    with patch.object(report, "_get_users_and_teams", return_value=({}, {})):
+        report.write_delta_report(
+            delta,
+            {"PGONE01": "0000000000000000"},
+            columns=["id", "email", "has_email", "invite_pending", "observer_in"],
+            output_format="jsonl",
+        )
+
+    assert json.loads(delta.getvalue()) == {
+        "change_type": "removed",
+        "id": "PGONE01",
+        "email": "",
+        "has_email": None,
+        "invite_pending": None,
+        "observer_in": None,
+    }
+
+
+def test_write_report(report: UserReport) -> None:
+    user_map = {"PSIUGWW": UserReportRow.build_from(json.loads(USER))}
+    target = StringIO()
+
+    with patch.object(report, "_get_users_and_teams", return_value=(user_map, {})):
+        result = report.write_report(target, columns=["id", "email"])
+
+    assert result == 1
+    assert target.getvalue() == "id,email\r\nPSIUGWW,preocts@preocts.com\r\n"
+
+
+def test_write_delta_report(report: UserReport) -> None:
+    user_map = {"PSIUGWW": UserReportRow.build_from(json.loads(USER))}
+    delta = StringIO()
+    snapshot = StringIO()
+
+    with patch.object(report, "_get_users_and_teams", return_value=(user_map, {})):
+        index = report.write_delta_report(
+            delta,
+            {"PGONE01": "0000000000000000"},
+            columns=["id"],
+            snapshot_target=snapshot,
+        )
+
+    assert delta.getvalue() == "change_type,id\r\nadded,PSIUGWW\r\nremoved,PGONE01\r\n"
+    assert snapshot.getvalue() == "id\r\nPSIUGWW\r\n"
+    assert list(index) == ["PSIUGWW"]
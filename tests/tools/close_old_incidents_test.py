@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
+import httpx
 import pytest
 from pd_utils.model import Incident
 from pd_utils.tool import close_old_incidents
@@ -52,64 +53,242 @@ def mock_incidents() -> list[Incident]:
 
 
 def test_get_newest_log_entry(closer: CloseOldIncidents) -> None:
-    mock_resp = json.loads(LOG_ENTRIES_RESP)["log_entries"][0]
-    resp = [([mock_resp], None, None)]
+    mock_resp = json.loads(LOG_ENTRIES_RESP)
 
-    with patch.object(closer._pdapi, "_query", side_effect=resp) as mockrun:
+    with patch.object(closer._pdapi, "get", return_value=mock_resp) as mockrun:
 
         results = closer._get_newest_log_entry("mock")
 
     assert mockrun.call_count == 1
+    assert mockrun.call_args.kwargs["params"]["limit"] == 1
+    assert results
     assert results["id"] == EXPECTED_LOG_ID
 
 
-def test_get_all_incidents(closer: CloseOldIncidents) -> None:
-    resps = json.loads(INCIDENTS_RESP)
-    resp_gen = (r["incidents"][0] for r in resps)
+@pytest.mark.parametrize(
+    "effect",
+    (
+        [None],
+        [{"log_entries": []}],
+        httpx.ConnectTimeout("timeout"),
+    ),
+)
+def test_get_newest_log_entry_failure(closer: CloseOldIncidents, effect: Any) -> None:
+    with patch.object(closer._pdapi, "get", side_effect=effect):
+
+        results = closer._get_newest_log_entry("mock")
+
+    assert results is None
+
+
+@pytest.mark.parametrize(
+    ("close_priority", "expected_ids"),
+    (
+        (False, {"Q36LM3UBN4V94O"}),
+        (True, EXPECTED_IDS),
+    ),
+)
+def test_get_all_incidents(
+    closer: CloseOldIncidents,
+    close_priority: bool,
+    expected_ids: set[str],
+) -> None:
+    resps = [r["incidents"][0] for r in json.loads(INCIDENTS_RESP)]
+    closer._close_priority = close_priority
+    oldest = datetool.add_offset(datetool.utcnow_isotime(), days=-400)
 
-    with patch.object(closer._pdapi, "query_iter", return_value=resp_gen):
+    with patch.object(closer, "_get_oldest_open_incident_time", return_value=oldest):
+        with patch.object(
+            closer._pdapi, "_list", return_value=(resps, False, 2)
+        ) as http:
+
+            results = list(closer._get_all_incidents())
+            params = http.call_args.args[2]
+
+    assert http.call_count == 3
+    assert "date_range" not in params
+    assert params["until"] < datetool.utcnow_isotime()
+    assert {i.incident_id for i in results} == expected_ids
+
+
+def test_get_all_incidents_window_boundary(closer: CloseOldIncidents) -> None:
+    resp = json.loads(INCIDENTS_RESP)[0]["incidents"][0]
+    oldest = datetool.add_offset(datetool.utcnow_isotime(), days=-200)
+    boundary = datetool.add_offset(oldest, days=PagerDutyAPI.max_range_days)
+    resp["created_at"] = boundary
+
+    with patch.object(closer, "_get_oldest_open_incident_time", return_value=oldest):
+        with patch.object(
+            closer._pdapi, "_list", return_value=([resp], False, 1)
+        ) as http:
+
+            results = list(closer._get_all_incidents())
+
+    assert http.call_count == 2
+    assert len(results) == 1
 
-        results = closer._get_all_incidents()
 
-    assert not {i.incident_id for i in results} - EXPECTED_IDS
+def test_get_all_incidents_none_old(closer: CloseOldIncidents) -> None:
+    newest = datetool.add_offset(datetool.utcnow_isotime(), days=1)
+
+    with patch.object(closer, "_get_oldest_open_incident_time", return_value=newest):
+        with patch.object(closer._pdapi, "window_iter") as http:
+
+            results = list(closer._get_all_incidents())
+
+    http.assert_not_called()
+    assert results == []
+
+
+def test_get_oldest_open_incident_time(closer: CloseOldIncidents) -> None:
+    resp = json.loads(INCIDENTS_RESP)[0]["incidents"]
+
+    with patch.object(closer._pdapi, "list_iter", return_value=iter(resp)) as http:
+
+        result = closer._get_oldest_open_incident_time()
+
+    assert http.call_args.args[3] == 1
+    assert http.call_args.args[2]["sort_by"] == "created_at:asc"
+    assert result == "2022-08-01T02:38:25Z"
+
+
+def test_get_oldest_open_incident_time_none_open(closer: CloseOldIncidents) -> None:
+    with patch.object(closer._pdapi, "list_iter", return_value=iter([])):
+
+        result = closer._get_oldest_open_incident_time()
+
+    assert result is None
 
 
 def test_isolate_old_incidents(
     closer: CloseOldIncidents,
     mock_incidents: list[Incident],
 ) -> None:
-    results = closer._isolate_old_incidents(mock_incidents)
+    results = list(closer._isolate_old_incidents(mock_incidents))
 
     assert len(results) == 1
     assert results[0].incident_number == 4
 
 
+def test_isolate_old_incidents_uses_run_clock(
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    closer._now += 6 * 86_400
+
+    results = list(closer._isolate_old_incidents(mock_incidents))
+
+    assert [inc.incident_id for inc in results] == ["b", "c", "d"]
+
+
 def test_isolate_nonpriority_incidents(
     closer: CloseOldIncidents,
     mock_incidents: list[Incident],
 ) -> None:
-    results = closer._isolate_nonpriority_incidents(mock_incidents)
+    results = list(closer._isolate_nonpriority_incidents(mock_incidents))
 
     assert len(results) == 2
     assert results[0].has_priority is False
 
 
-def test_isolate_inactive_incidents(
+def test_isolate_inactive_by_lookup(
     closer: CloseOldIncidents,
     mock_incidents: list[Incident],
 ) -> None:
     mocklog = json.loads(LOG_ENTRIES_RESP)["log_entries"][0]
-    mocklogs: list[dict[str, Any]] = []
+    mocklogs: dict[str, dict[str, Any] | None] = {}
     for inc in mock_incidents:
         mocklog["created_at"] = inc.created_at
-        mocklogs.append(mocklog.copy())
+        mocklogs[inc.incident_id] = mocklog.copy()
+    mocklogs["c"] = None
 
-    with patch.object(closer, "_get_newest_log_entry", side_effect=mocklogs):
+    with patch.object(closer, "_get_newest_log_entry", side_effect=mocklogs.get):
 
-        results = closer._isolate_inactive_incidents(mock_incidents)
+        results = list(closer._isolate_inactive_by_lookup(mock_incidents))
 
     assert len(results) == 1
     assert results[0].incident_number == 4
+    assert [inc.incident_id for inc in closer._check_errors] == ["c"]
+
+
+@pytest.mark.parametrize(
+    ("estimate", "strategy"),
+    (
+        (None, "_isolate_inactive_by_lookup"),
+        (4, "_isolate_inactive_by_lookup"),
+        (3, "_isolate_inactive_by_sweep"),
+    ),
+)
+def test_isolate_inactive_incidents_strategy(
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+    estimate: int | None,
+    strategy: str,
+) -> None:
+    with patch.object(closer, "_estimate_sweep_requests", return_value=estimate):
+        with patch.object(closer, strategy, return_value=[]) as expected:
+
+            list(closer._isolate_inactive_incidents(mock_incidents))
+
+    expected.assert_called_once()
+    assert list(expected.call_args.args[0]) == mock_incidents
+
+
+def test_isolate_inactive_by_sweep(
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    with patch.object(closer, "_get_recently_active_ids", return_value={"a", "c"}):
+
+        results = list(closer._isolate_inactive_by_sweep(mock_incidents))
+
+    assert [inc.incident_id for inc in results] == ["b", "d"]
+
+
+@pytest.mark.parametrize(
+    ("effect", "expected"),
+    (
+        ([{"log_entries": [], "total": 250}], 3),
+        ([{"log_entries": [], "total": 0}], 0),
+        ([{"log_entries": [], "total": None}], None),
+        ([None], None),
+        (httpx.ConnectTimeout("timeout"), None),
+    ),
+)
+def test_estimate_sweep_requests(
+    closer: CloseOldIncidents,
+    effect: Any,
+    expected: int | None,
+) -> None:
+    with patch.object(closer._pdapi, "get", side_effect=effect) as http:
+
+        result = closer._estimate_sweep_requests()
+
+    assert http.call_args.kwargs["params"]["total"] is True
+    assert result == expected
+
+
+def test_estimate_sweep_requests_range_too_long() -> None:
+    closer = CloseOldIncidents(PagerDutyAPI("", "", 1), close_after_days=200)
+
+    with patch.object(closer._pdapi, "get") as http:
+
+        result = closer._estimate_sweep_requests()
+
+    http.assert_not_called()
+    assert result is None
+
+
+def test_get_recently_active_ids(closer: CloseOldIncidents) -> None:
+    resp = json.loads(LOG_ENTRIES_RESP)["log_entries"] * 2
+
+    with patch.object(closer._pdapi, "window_iter", return_value=resp) as http:
+
+        result = closer._get_recently_active_ids()
+
+    assert http.call_args.args[0] == "/log_entries"
+    assert http.call_args.args[3] == closer._cutoff_isotime()
+    assert result == {"Q3YH44AL350A23"}
 
 
 @pytest.mark.parametrize(("mesp", "expect"), (({"some": "resp"}, True), (None, False)))
@@ -132,32 +311,94 @@ def test_resolve_incident(
     assert result is expect
 
 
-def test_close_incidents(
+def test_close_incidents_batches(
+    tmp_path: Path,
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    journal = str(tmp_path / "journal")
+    resps = [[{"id": "a"}, {"id": "c"}], [{"id": "d"}]]
+
+    with patch.object(close_old_incidents, "BULK_LIMIT", 3):
+        with patch.object(closer._pdapi, "put_bulk", side_effect=resps) as http:
+
+            result = closer._close_incidents(iter(mock_incidents), journal)
+            payloads = [call.args[2] for call in http.call_args_list]
+
+    results = closer._read_journal(journal)
+
+    assert [len(payload) for payload in payloads] == [3, 1]
+    assert payloads[0][0]["status"] == "resolved"
+    assert payloads[0][0]["title"].startswith(close_old_incidents.TITLE_TAG)
+    assert result == (3, 1)
+    assert [key for key, (success, _) in results.items() if success] == [
+        "a",
+        "c",
+        "d",
+    ]
+    assert [key for key, (success, _) in results.items() if not success] == ["b"]
+
+
+def test_close_incidents_fallback_to_single(
     closer: CloseOldIncidents,
     mock_incidents: list[Incident],
 ) -> None:
     resps = [True, False, True, False]
 
-    with patch.object(closer._pdapi, "put", side_effect=resps):
+    with patch.object(closer._pdapi, "put_bulk", return_value=None):
+        with patch.object(closer._pdapi, "put", side_effect=resps) as http:
 
-        success, error = closer._close_incidents(mock_incidents)
+            result = closer._close_incidents(mock_incidents)
 
-    assert len(success) == 2
-    assert len(error) == 2
+    assert http.call_count == 4
+    assert result == (2, 2)
+
+
+def test_close_incidents_fallback_on_bulk_timeout(
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    timeout = httpx.ReadTimeout("mock timeout")
+
+    with patch.object(closer._pdapi._http, "put", side_effect=timeout):
+        with patch.object(closer._pdapi, "put", return_value=True) as http:
+
+            result = closer._close_incidents(mock_incidents)
+
+    assert http.call_count == 4
+    assert result == (4, 0)
 
 
 def test_run_empty_results(closer: CloseOldIncidents) -> None:
-    resp_gen = []  # type: ignore
-    with patch.object(closer._pdapi, "query_iter", return_value=resp_gen) as http:
+    with patch.object(closer._pdapi, "_list", return_value=([], False, 0)) as http:
+        with patch.object(closer, "_estimate_sweep_requests") as avoid:
+            closer.run()
+
+            assert http.call_count == 1
+            avoid.assert_not_called()
+
+
+def test_run_streams_preview(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    closer._close_active = True
+
+    with patch.object(closer, "_get_all_incidents", return_value=mock_incidents):
         closer.run()
 
-        assert http.call_count == 1
+    preview = next(tmp_path.glob("close-old-incidents-preview-*.csv")).read_text()
+
+    assert preview.count("\n") == 2
+    assert "\nb,4,Old," in preview
 
 
 def test_run_empty_ignore_activity(closer: CloseOldIncidents) -> None:
-    resp_gen = []  # type: ignore
     closer._close_active = True
-    with patch.object(closer._pdapi, "query_iter", return_value=resp_gen):
+    with patch.object(closer, "_get_all_incidents", return_value=[]):
         with patch.object(closer, "_isolate_inactive_incidents") as avoid:
             closer.run()
 
@@ -166,3 +407,104 @@ def test_run_empty_ignore_activity(closer: CloseOldIncidents) -> None:
 
 def test_run_empty_file(mock_filename: str, closer: CloseOldIncidents) -> None:
     closer.run(mock_filename)
+
+
+def test_write_and_read_journal(
+    tmp_path: Path,
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    journal = str(tmp_path / "journal")
+    a, b, c, d = mock_incidents
+
+    closer._write_journal(journal, [a, b], [c])
+    closer._write_journal(journal, [c], [d])
+    with open(journal, "a") as outfile:
+        outfile.write('{"success": true, "inci')
+
+    results = closer._read_journal(journal)
+
+    assert results == {
+        "a": (True, a),
+        "b": (True, b),
+        "c": (True, c),
+        "d": (False, d),
+    }
+
+
+def test_read_journal_missing(tmp_path: Path, closer: CloseOldIncidents) -> None:
+    assert closer._read_journal(str(tmp_path / "journal")) == {}
+
+
+@pytest.mark.parametrize(
+    ("resume", "expected_ids"),
+    (
+        (True, ["b", "c", "d"]),
+        (False, ["a", "b", "c", "d"]),
+    ),
+)
+def test_run_inputfile_journal_resume(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+    resume: bool,
+    expected_ids: list[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    inputfile = tmp_path / "preview.csv"
+    inputfile.write_text(MOCK_REPORT)
+    closer._write_journal(f"{inputfile}.journal", [mock_incidents[0]], [])
+    closer._write_journal(f"{inputfile}.journal", [], [mock_incidents[1]])
+    resp = [{"id": "c"}, {"id": "d"}]
+
+    with patch.object(closer._pdapi, "put_bulk", return_value=resp) as http:
+        closer.run(str(inputfile), resume=resume)
+
+    successes = next(tmp_path.glob("close-old-incidents-2*.csv")).read_text()
+    errors = next(tmp_path.glob("close-old-incidents-errors-*.csv")).read_text()
+
+    assert [payload["id"] for payload in http.call_args.args[2]] == expected_ids
+    assert successes.count("\n") == 3 + resume
+    assert errors.count("\n") == 3 - resume
+
+
+def test_run_inputfile_resume_retries_errors(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    closer: CloseOldIncidents,
+    mock_incidents: list[Incident],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    inputfile = tmp_path / "preview.csv"
+    inputfile.write_text(MOCK_REPORT)
+    journal = f"{inputfile}.journal"
+    closer._write_journal(journal, [mock_incidents[0]], mock_incidents[1:])
+    resp = [{"id": "b"}, {"id": "c"}, {"id": "d"}]
+
+    with patch.object(closer._pdapi, "put_bulk", return_value=resp) as http:
+        closer.run(str(inputfile), resume=True)
+
+    successes = next(tmp_path.glob("close-old-incidents-2*.csv")).read_text()
+
+    assert [payload["id"] for payload in http.call_args.args[2]] == ["b", "c", "d"]
+    assert all(success for success, _ in closer._read_journal(journal).values())
+    assert successes.count("\n") == 5
+
+
+def test_run_inputfile_typed_rows(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    closer: CloseOldIncidents,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    inputfile = tmp_path / "preview.csv"
+    inputfile.write_text(MOCK_REPORT)
+
+    with patch.object(closer, "_close_incidents", return_value=(0, 0)) as close:
+        closer.run(str(inputfile))
+        incidents = list(close.call_args.args[0])
+
+    assert len(incidents) == 4
+    assert all(isinstance(inc.has_priority, bool) for inc in incidents)
+    assert all(isinstance(inc.urgency, str) for inc in incidents)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import gzip
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pd_utils.tool.incident_export import IncidentExport
+from pd_utils.util.pagerduty_api import PagerDutyAPI
+
+INCIDENTS_RESP = Path("tests/fixture/close-incidents/incidents.json").read_text()
+
+
+@pytest.fixture
+def exporter() -> IncidentExport:
+    return IncidentExport(PagerDutyAPI("", "", 1), shard_days=1)
+
+
+def mock_incident(incident_id: str, created_at: str) -> dict[str, Any]:
+    resp = json.loads(INCIDENTS_RESP)[0]["incidents"][0]
+    resp["id"] = incident_id
+    resp["created_at"] = created_at
+    resp["acknowledgements"] = []
+    return resp
+
+
+def shard_iter(
+    resps: list[dict[str, Any]],
+) -> Callable[..., list[dict[str, Any]]]:
+    return lambda route, *args, **kwargs: resps if route == "/incidents" else []
+
+
+def test_shard_days_clamped() -> None:
+    exporter = IncidentExport(PagerDutyAPI("", "", 1), shard_days=365)
+
+    assert exporter._shard_days == 180
+
+
+def test_get_shard_boundary(exporter: IncidentExport) -> None:
+    resps = [
+        mock_incident("a", "2022-08-01T00:00:00Z"),
+        mock_incident("b", "2022-08-02T00:00:00Z"),
+    ]
+
+    with patch.object(exporter._pdapi, "window_iter", return_value=resps) as mock:
+
+        results = exporter._get_shard("2022-08-01T00:00:00Z", "2022-08-02T00:00:00Z")
+        since, until = mock.call_args.args[3:5]
+
+    assert [row.incident_id for row in results] == ["a"]
+    assert since == "2022-08-01T00:00:00Z"
+    assert until == "2022-08-02T00:00:00Z"
+
+
+def test_get_shard_boundary_last(exporter: IncidentExport) -> None:
+    resps = [mock_incident("b", "2022-08-02T00:00:00Z")]
+
+    with patch.object(exporter._pdapi, "window_iter", return_value=resps):
+
+        results = exporter._get_shard(
+            "2022-08-01T00:00:00Z",
+            "2022-08-02T00:00:00Z",
+            last=True,
+        )
+
+    assert [row.incident_id for row in results] == ["b"]
+
+
+def mock_log_entry(
+    incident_id: str, entry_type: str, created_at: str
+) -> dict[str, Any]:
+    return {
+        "id": f"{incident_id}-{created_at}",
+        "type": entry_type,
+        "created_at": created_at,
+        "incident": {"id": incident_id},
+    }
+
+
+def test_sweep_first_acks(exporter: IncidentExport) -> None:
+    entries = [
+        mock_log_entry("a", "trigger_log_entry", "2022-08-01T00:00:00Z"),
+        mock_log_entry("b", "acknowledge_log_entry", "2022-08-01T01:00:10Z"),
+        mock_log_entry("a", "acknowledge_log_entry", "2022-08-01T00:01:00Z"),
+        mock_log_entry("a", "acknowledge_log_entry", "2022-08-01T00:00:30Z"),
+        mock_log_entry("a", "resolve_log_entry", "2022-08-03T00:00:00Z"),
+    ]
+
+    with patch.object(exporter._pdapi, "window_iter", return_value=entries) as mock:
+
+        results = exporter._sweep_first_acks(
+            "2022-08-01T00:00:00Z", "2022-12-01T00:00:00Z"
+        )
+
+    assert results == {"a": "2022-08-01T00:00:30Z", "b": "2022-08-01T01:00:10Z"}
+    assert mock.call_args.args[0] == "/log_entries"
+    assert mock.call_args.kwargs["max_days"] == 180
+
+
+@pytest.mark.parametrize(
+    ("incident_id", "status", "expected", "pulled"),
+    (
+        # Acknowledgements of unresolved incidents are left on the incident
+        ("a", "acknowledged", "", False),
+        ("a", "resolved", "2022-08-01T00:00:30Z", False),
+        # Resolved within the sweep, never acknowledged
+        ("b", "resolved", "", False),
+        # Resolved after the sweep, log entries are pulled for the incident
+        ("c", "resolved", "2022-08-06T00:00:00Z", True),
+    ),
+)
+def test_first_ack(
+    exporter: IncidentExport,
+    incident_id: str,
+    status: str,
+    expected: str,
+    pulled: bool,
+) -> None:
+    resp = mock_incident(incident_id, "2022-08-01T00:00:00Z")
+    resp["status"] = status
+    resp["resolved_at"] = "2022-08-07T00:00:00Z" if incident_id == "c" else None
+    resp["last_status_change_at"] = "2022-08-02T00:00:00Z"
+    exporter._first_acks = {"a": "2022-08-01T00:00:30Z"}
+    exporter._swept_until = "2022-08-05T00:00:00Z"
+    entries = [
+        mock_log_entry("c", "acknowledge_log_entry", "2022-08-06T00:01:00Z"),
+        mock_log_entry("c", "acknowledge_log_entry", "2022-08-06T00:00:00Z"),
+    ]
+
+    with patch.object(exporter._pdapi, "list_iter", return_value=entries) as mock:
+
+        result = exporter._first_ack(resp)
+
+    assert result == expected
+    assert mock.called is pulled
+    if pulled:
+        assert mock.call_args.args[0] == "/incidents/c/log_entries"
+
+
+def test_export_in_shard_order(exporter: IncidentExport) -> None:
+    def window_iter(*args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        since = args[3]
+        return [mock_incident(since[8:10], since)] if args[0] == "/incidents" else []
+
+    with patch.object(exporter._pdapi, "window_iter", side_effect=window_iter) as mock:
+
+        results = list(exporter.export("2022-08-01T00:00:00Z", "2022-08-05T12:00:00Z"))
+
+    assert mock.call_count == 6
+    assert mock.call_args_list[0].args[0] == "/log_entries"
+    assert [row.incident_id for row in results] == ["01", "02", "03", "04", "05"]
+    assert exporter.metrics.incidents == 5
+
+
+def test_run(
+    exporter: IncidentExport,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    resps = [mock_incident("a", "2022-08-01T00:00:00Z")]
+    monkeypatch.chdir(tmp_path)
+
+    with patch.object(exporter._pdapi, "window_iter", side_effect=shard_iter(resps)):
+        exporter.run("2022-08-01T00:00:00Z", "2022-08-02T00:00:00Z", True)
+
+    export = next(tmp_path.glob("incident-export-2*.csv")).read_text()
+    summary = next(tmp_path.glob("incident-export-summary-*.csv")).read_text()
+    assert export.count("\n") == 2
+    assert summary.startswith("incidents,acknowledged,resolved")
+
+
+def test_run_gzip(
+    exporter: IncidentExport,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    resps = [mock_incident("a", "2022-08-01T00:00:00Z")]
+    monkeypatch.chdir(tmp_path)
+
+    with patch.object(exporter._pdapi, "window_iter", side_effect=shard_iter(resps)):
+        exporter.run("2022-08-01T00:00:00Z", "2022-08-02T00:00:00Z", compress=True)
+
+    export = next(tmp_path.glob("incident-export-*.csv.gz")).read_bytes()
+    assert gzip.decompress(export).decode().count("\n") == 2
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import io
 import json
+import sqlite3
 import sys
+import threading
 from collections.abc import Generator
+from http.client import RemoteDisconnected
+from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
@@ -69,3 +75,353 @@ def test_console_handler_1_exit_6_args(mock_http: MagicMock) -> None:
         result = simple_alert.console_handler()
 
     assert result == 1
+
+
+def test_send_alert_closes_connection(mock_http: MagicMock) -> None:
+    simple_alert.send_alert("routing", "title", "body", "egg")
+
+    mock_http().close.assert_called_once()
+
+
+def test_send_alerts(mock_http: MagicMock) -> None:
+    mock_http().getresponse().status = 202
+    mock_http().getresponse().read.return_value = b"ok"
+    events = [
+        simple_alert.build_alert("routing", "title", str(i), "") for i in range(9)
+    ]
+    mock_http.reset_mock()
+
+    results = simple_alert.send_alerts(iter(events), workers=3)
+
+    assert [result.position for result in results] == list(range(9))
+    assert all(result.ok for result in results)
+    assert mock_http.call_count == 3
+    assert mock_http.return_value.request.call_count == 9
+    assert mock_http.return_value.close.call_count == 3
+
+
+def test_send_alerts_reconnects_once(mock_http: MagicMock) -> None:
+    mock_http().getresponse().status = 202
+    mock_http().getresponse().read.return_value = b"ok"
+    mock_http().request.side_effect = [ConnectionResetError(), None]
+
+    results = simple_alert.send_alerts([{"event": 1}], workers=1)
+
+    assert results == [simple_alert.AlertResult(0, 202, "ok")]
+
+
+def test_send_alerts_reconnects_on_remote_disconnect(mock_http: MagicMock) -> None:
+    mock_http().getresponse.side_effect = [
+        RemoteDisconnected("closed"),
+        MagicMock(status=202, read=MagicMock(return_value=b"ok")),
+    ]
+
+    results = simple_alert.send_alerts([{"event": 1}], workers=1)
+
+    assert results == [simple_alert.AlertResult(0, 202, "ok")]
+    assert mock_http().request.call_count == 2
+
+
+@pytest.mark.parametrize(
+    ("error", "sock"),
+    (
+        # The event may have been received before the response timed out
+        (TimeoutError("timed out"), MagicMock()),
+        (ConnectionResetError("reset"), MagicMock()),
+        # A new connection was not dropped while idle
+        (RemoteDisconnected("closed"), None),
+    ),
+)
+def test_send_alerts_no_resend_after_request(
+    mock_http: MagicMock,
+    error: Exception,
+    sock: MagicMock | None,
+) -> None:
+    mock_http().sock = sock
+    mock_http().getresponse.side_effect = error
+
+    results = simple_alert.send_alerts([{"event": 1}], workers=1)
+
+    assert results == [simple_alert.AlertResult(0, 0, str(error))]
+    assert mock_http().request.call_count == 1
+
+
+def test_send_alerts_failure(mock_http: MagicMock) -> None:
+    mock_http().request.side_effect = OSError("down")
+
+    results = simple_alert.send_alerts([{"event": 1}], workers=1)
+
+    assert results == [simple_alert.AlertResult(0, 0, "down")]
+    assert mock_http().request.call_count == 1
+    assert not results[0].ok
+
+
+def test_jsonl_handler(mock_http: MagicMock, tmp_path: Path) -> None:
+    mock_http().getresponse().status = 202
+    mock_http().getresponse().read.return_value = b"ok"
+    events = tmp_path / "events.jsonl"
+    events.write_text('{"routing_key": "mine"}\n\n{"event_action": "trigger"}\n')
+
+    result = simple_alert.jsonl_handler(str(events), "default")
+    bodies = [json.loads(c.args[2]) for c in mock_http().request.call_args_list]
+
+    assert result == 0
+    assert [body["routing_key"] for body in bodies] == ["mine", "default"]
+
+
+def test_send_alerts_unexpected_error_does_not_hang(mock_http: MagicMock) -> None:
+    mock_http().getresponse().status = 202
+    mock_http().getresponse().read.return_value = b"ok"
+    events = [{"bad": object()}] + [{"event": idx} for idx in range(20)]
+
+    results = simple_alert.send_alerts(events, workers=1)
+
+    assert len(results) == 21
+    assert results[0].status == 0
+    assert "not JSON serializable" in results[0].response
+    assert all(result.ok for result in results[1:])
+
+
+def test_jsonl_handler_skips_invalid_lines(
+    mock_http: MagicMock,
+    tmp_path: Path,
+) -> None:
+    mock_http().getresponse().status = 202
+    mock_http().getresponse().read.return_value = b"ok"
+    events = tmp_path / "events.jsonl"
+    events.write_text('{"event": 1}\n{"event": \n[1, 2]\n{"event": 2}\n')
+    mock_http.reset_mock()
+
+    result = simple_alert.jsonl_handler(str(events), "default")
+
+    assert result == 1
+    assert mock_http.return_value.request.call_count == 2
+
+
+def test_jsonl_handler_stdin_failure(mock_http: MagicMock) -> None:
+    mock_http().getresponse().status = 400
+    mock_http().getresponse().read.return_value = b"bad"
+
+    with patch.object(sys, "stdin", io.StringIO('{"event": 1}\n')):
+        result = simple_alert.jsonl_handler("-")
+
+    assert result == 1
+
+
+def test_console_handler_jsonl(mock_http: MagicMock) -> None:
+    with patch.object(simple_alert, "jsonl_handler", return_value=0) as handler:
+        with patch.object(sys, "argv", ["simple_alert", "--jsonl", "-", "route"]):
+            result = simple_alert.console_handler()
+
+    assert result == 0
+    handler.assert_called_once_with("-", "route")
+
+
+def test_console_handler_jsonl_1_exit_no_source(mock_http: MagicMock) -> None:
+    with patch.object(sys, "argv", ["simple_alert", "--jsonl"]):
+        result = simple_alert.console_handler()
+
+    assert result == 1
+
+
+@pytest.fixture
+def spool(tmp_path: Path) -> Generator[simple_alert.EventSpool, None, None]:
+    spool = simple_alert.EventSpool(str(tmp_path / "spool.db"), batch_size=2)
+    yield spool
+    spool.stop(flush=False)
+
+
+def test_spool_enqueue_assigns_dedup(
+    spool: simple_alert.EventSpool,
+    tmp_path: Path,
+) -> None:
+    first = spool.enqueue({"event_action": "trigger"})
+    second = spool.enqueue({"event_action": "trigger", "dedup_key": "egg"})
+
+    reopened = simple_alert.EventSpool(str(tmp_path / "spool.db"))
+
+    assert first
+    assert second == "egg"
+    assert reopened.pending() == 2
+
+
+def test_spool_flush(mock_http: MagicMock, spool: simple_alert.EventSpool) -> None:
+    mock_http().getresponse().status = 202
+    for _ in range(3):
+        spool.enqueue({"event_action": "trigger"})
+
+    first = spool.flush()
+    second = spool.flush()
+
+    assert first == 2
+    assert second == 1
+    assert spool.pending() == 0
+
+
+@pytest.mark.parametrize("status", (429, 500))
+def test_spool_flush_keeps_event_and_backs_off(
+    mock_http: MagicMock,
+    spool: simple_alert.EventSpool,
+    status: int,
+) -> None:
+    mock_http().getresponse().status = status
+    dedup = spool.enqueue({"event_action": "trigger"})
+
+    spool.flush()
+    spool.flush()
+    body = json.loads(mock_http().request.call_args.args[2])
+
+    assert spool.pending() == 1
+    assert spool._backoff == 2.0
+    assert body["dedup_key"] == dedup
+
+
+def test_spool_flush_drops_invalid_event(
+    mock_http: MagicMock,
+    spool: simple_alert.EventSpool,
+) -> None:
+    mock_http().getresponse().status = 400
+
+    spool.enqueue({"event_action": "trigger"})
+    result = spool.flush()
+
+    assert result == 1
+    assert spool.pending() == 0
+    assert spool._backoff == 0.0
+
+
+def test_spool_background_flusher(
+    mock_http: MagicMock,
+    spool: simple_alert.EventSpool,
+    tmp_path: Path,
+) -> None:
+    mock_http().getresponse().status = 202
+
+    with spool:
+        for _ in range(5):
+            spool.enqueue({"event_action": "trigger"})
+
+    reopened = simple_alert.EventSpool(str(tmp_path / "spool.db"))
+
+    assert reopened.pending() == 0
+    assert spool._thread is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        spool.pending()
+
+
+def test_spool_background_flusher_survives_flush_error(
+    spool: simple_alert.EventSpool,
+) -> None:
+    spool._max_backoff = 0.01
+    calls = threading.Event()
+
+    def flush() -> int:
+        if calls.is_set():
+            spool._stopping.set()
+            return 0
+        calls.set()
+        raise RuntimeError("boom")
+
+    with patch.object(spool, "flush", side_effect=flush):
+        spool._run()
+
+    assert calls.is_set()
+    assert spool._backoff == 0.01
+
+
+class MockClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def storm_event(dedup: str, severity: str = "critical") -> dict[str, Any]:
+    event = simple_alert.build_alert("routing", "title", "body", dedup)
+    event["payload"]["severity"] = severity
+    return event
+
+
+def test_coalescer_forwards_first_and_latest_change() -> None:
+    sent: list[dict[str, Any]] = []
+    clock = MockClock()
+    coalescer = simple_alert.AlertCoalescer(
+        sent.append, window=10, clock=clock, background=False
+    )
+
+    first = coalescer.submit(storm_event("a"))
+    repeats = [coalescer.submit(storm_event("a")) for _ in range(100)]
+    coalescer.submit(storm_event("a", "error"))
+    coalescer.submit(storm_event("a", "warning"))
+    clock.now = 10
+    flushed = coalescer.flush()
+
+    assert first is True
+    assert not any(repeats)
+    assert flushed == 1
+    assert [event["payload"]["severity"] for event in sent] == ["critical", "warning"]
+    assert coalescer.stats == {"received": 103, "forwarded": 2, "suppressed": 101}
+
+
+def test_coalescer_change_reverted_within_window() -> None:
+    sent: list[dict[str, Any]] = []
+    coalescer = simple_alert.AlertCoalescer(
+        sent.append, window=10, clock=MockClock(), background=False
+    )
+
+    coalescer.submit(storm_event("a"))
+    coalescer.submit(storm_event("a", "error"))
+    coalescer.submit(storm_event("a"))
+    closed = coalescer.close()
+
+    assert closed == 0
+    assert len(sent) == 1
+    assert coalescer.stats["suppressed"] == 2
+
+
+def test_coalescer_keys_and_no_dedup() -> None:
+    sent: list[dict[str, Any]] = []
+    clock = MockClock()
+    coalescer = simple_alert.AlertCoalescer(
+        sent.append, window=10, clock=clock, background=False
+    )
+
+    coalescer.submit(storm_event("a"))
+    coalescer.submit(storm_event("b"))
+    no_dedup = [coalescer.submit(storm_event("")) for _ in range(2)]
+    clock.now = 11
+    reopened = coalescer.submit(storm_event("a"))
+
+    assert all(no_dedup)
+    assert reopened is True
+    assert [event["dedup_key"] for event in sent] == ["a", "b", "", "", "a"]
+
+
+def test_coalescer_timer_sends_held_event() -> None:
+    sent: list[dict[str, Any]] = []
+    coalescer = simple_alert.AlertCoalescer(sent.append, window=0.05)
+
+    coalescer.submit(storm_event("a"))
+    coalescer.submit(storm_event("a", "warning"))
+    thread = coalescer._thread
+    assert thread is not None
+    thread.join(timeout=5)
+
+    assert [event["payload"]["severity"] for event in sent] == ["critical", "warning"]
+    assert coalescer._thread is None
+    assert coalescer.close() == 0
+
+
+def test_coalescer_close_stops_timer() -> None:
+    sent: list[dict[str, Any]] = []
+    coalescer = simple_alert.AlertCoalescer(sent.append, window=60)
+
+    coalescer.submit(storm_event("a"))
+    coalescer.submit(storm_event("a", "warning"))
+    thread = coalescer._thread
+    closed = coalescer.close()
+
+    assert thread is not None and not thread.is_alive()
+    assert closed == 1
+    assert len(sent) == 2
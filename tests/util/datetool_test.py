@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import calendar
 from datetime import datetime
 from unittest.mock import MagicMock
 
@@ -46,37 +47,6 @@ def test_add_offset() -> None:
     assert result == expected
 
 
-@pytest.mark.parametrize(
-    ("time_slots", "expected"),
-    (
-        (
-            [
-                ("2022-07-30T12:30:00Z", "2022-07-31T00:00:00Z"),
-                ("2022-07-30T00:00:00Z", "2022-07-30T12:00:00Z"),
-                ("2022-07-29T12:30:00Z", "2022-07-30T00:00:00Z"),
-                ("2022-07-29T04:18:19Z", "2022-07-29T12:00:00Z"),
-            ],
-            False,
-        ),
-        (
-            [
-                ("2022-07-30T12:00:00Z", "2022-07-31T00:00:00Z"),
-                ("2022-07-30T00:00:00Z", "2022-07-30T12:00:00Z"),
-                ("2022-07-29T12:00:00Z", "2022-07-30T00:00:00Z"),
-                ("2022-07-29T04:18:19Z", "2022-07-29T12:00:00Z"),
-            ],
-            True,
-        ),
-        (
-            [],
-            False,
-        ),
-    ),
-)
-def test_is_gapless(time_slots: list[tuple[str, str]], expected: bool) -> None:
-    assert datetool._is_gapless(time_slots) is expected
-
-
 @pytest.mark.parametrize(
     ("time_slots", "start", "stop", "expected"),
     (
@@ -157,3 +127,173 @@ def test_to_seconds(from_: str, to_: str, expected: int) -> None:
     result = datetool.to_seconds(from_, to_)
 
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    ("start", "stop", "days", "expected"),
+    (
+        (
+            "2022-01-01T00:00:00Z",
+            "2022-01-05T12:00:00Z",
+            2,
+            [
+                ("2022-01-01T00:00:00Z", "2022-01-03T00:00:00Z"),
+                ("2022-01-03T00:00:00Z", "2022-01-05T00:00:00Z"),
+                ("2022-01-05T00:00:00Z", "2022-01-05T12:00:00Z"),
+            ],
+        ),
+        (
+            "2022-01-01T00:00:00Z",
+            "2022-01-02T00:00:00Z",
+            180,
+            [("2022-01-01T00:00:00Z", "2022-01-02T00:00:00Z")],
+        ),
+        ("2022-01-02T00:00:00Z", "2022-01-01T00:00:00Z", 1, []),
+    ),
+)
+def test_split_range(
+    start: str,
+    stop: str,
+    days: int,
+    expected: list[tuple[str, str]],
+) -> None:
+    assert datetool.split_range(start, stop, days) == expected
+
+
+def test_split_range_invalid_days() -> None:
+    with pytest.raises(ValueError):
+        datetool.split_range("2022-01-01T00:00:00Z", "2022-01-02T00:00:00Z", 0)
+
+
+def test_to_epoch() -> None:
+    result = datetool.to_epoch(MOCK_ISO)
+
+    assert result == 1671976230
+
+
+def test_to_epoch_with_offset() -> None:
+    result = datetool.to_epoch("2022-12-25T08:50:30-05:00")
+
+    assert result == 1671976230
+
+
+def test_from_epoch() -> None:
+    result = datetool.from_epoch(1671976230)
+
+    assert result == MOCK_ISO
+
+
+@pytest.mark.usefixtures("patch_datetime_utcnow")
+def test_utcnow_epoch() -> None:
+    result = datetool.utcnow_epoch()
+
+    assert result == 1671976230
+
+
+@pytest.mark.parametrize(
+    "isotime",
+    (
+        "1970-01-01T00:00:00Z",
+        "2000-02-29T23:59:59Z",
+        "2022-12-25T13:50:30Z",
+        "2100-03-01T00:00:00Z",
+        "2022-12-25T13:50:30.250Z",
+    ),
+)
+def test_to_epoch_matches_general_parser(isotime: str) -> None:
+    expected = calendar.timegm(datetool.to_datetime(isotime).utctimetuple())
+
+    assert datetool.to_epoch(isotime) == expected
+
+
+@pytest.mark.parametrize(
+    "isotime",
+    ("2022-02-29T00:00:00Z", "2022-04-31T00:00:00Z", "2022-12-25T24:00:00Z"),
+)
+def test_to_epoch_invalid_raises(isotime: str) -> None:
+    with pytest.raises(ValueError):
+        datetool.to_epoch(isotime)
+
+
+def test_to_epoch_caches_repeats() -> None:
+    datetool.to_epoch.cache_clear()
+
+    for _ in range(5):
+        datetool.to_epoch(MOCK_ISO)
+
+    assert datetool.to_epoch.cache_info().hits == 4
+
+
+def test_interval_set_merges_and_sorts() -> None:
+    intervals = datetool.IntervalSet([(30, 40), (0, 10), (10, 20), (5, 8), (50, 50)])
+
+    assert list(intervals) == [(0, 20), (30, 40)]
+    assert len(intervals) == 2
+    assert intervals.total_seconds() == 30
+    assert intervals == datetool.IntervalSet([(0, 20), (30, 40)])
+    assert hash(intervals) == hash(datetool.IntervalSet([(30, 40), (0, 20)]))
+
+
+@pytest.mark.parametrize(
+    ("epoch", "expected"),
+    ((-1, False), (0, True), (19, True), (20, False), (35, True), (40, False)),
+)
+def test_interval_set_contains(epoch: int, expected: bool) -> None:
+    intervals = datetool.IntervalSet([(0, 20), (30, 40)])
+
+    assert (epoch in intervals) is expected
+
+
+@pytest.mark.parametrize(
+    ("start", "stop", "expected"),
+    (
+        (0, 20, True),
+        (5, 15, True),
+        (30, 40, True),
+        (15, 35, False),
+        (-5, 5, False),
+        (35, 45, False),
+        (25, 25, True),
+    ),
+)
+def test_interval_set_covers(start: int, stop: int, expected: bool) -> None:
+    intervals = datetool.IntervalSet([(0, 20), (30, 40)])
+
+    assert intervals.covers(start, stop) is expected
+
+
+def test_interval_set_algebra() -> None:
+    left = datetool.IntervalSet([(0, 10), (20, 30), (40, 50)])
+    right = datetool.IntervalSet([(5, 25), (45, 60)])
+
+    assert list(left | right) == [(0, 30), (40, 60)]
+    assert list(left & right) == [(5, 10), (20, 25), (45, 50)]
+    assert list(left - right) == [(0, 5), (25, 30), (40, 45)]
+    assert list(right - left) == [(10, 20), (50, 60)]
+    assert list(left.complement(-5, 45)) == [(-5, 0), (10, 20), (30, 40)]
+    assert list(datetool.IntervalSet().complement(0, 10)) == [(0, 10)]
+    assert not datetool.IntervalSet() - right
+
+
+def test_interval_set_from_isotimes() -> None:
+    intervals = datetool.IntervalSet.from_isotimes(
+        [
+            ("2022-12-25T13:51:30Z", "2022-12-25T13:52:30Z"),
+            (MOCK_ISO, "2022-12-25T13:51:30Z"),
+        ]
+    )
+
+    assert list(intervals) == [(1671976230, 1671976350)]
+
+
+def test_is_covered_ignores_gaps_outside_range() -> None:
+    time_slots = [
+        ("2022-07-29T00:00:00Z", "2022-07-29T12:00:00Z"),
+        ("2022-07-30T00:00:00Z", "2022-07-31T00:00:00Z"),
+    ]
+
+    result = datetool.is_covered(
+        time_slots, "2022-07-30T06:00:00Z", "2022-07-31T00:00:00Z"
+    )
+
+    assert result is True
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import gzip
+import json
 from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
 
 import pytest
 from pd_utils.model.base import Base
@@ -33,6 +37,13 @@ def mockmodel() -> tuple[list[MockModel], str]:
     return sample, expected
 
 
+@dataclass
+class MockOptionalModel(Base):
+    name: str
+    ratio: float | None
+    count: int | None = None
+
+
 def test_to_csv_string(mockmodel: tuple[list[MockModel], str]) -> None:
     sample, expected = mockmodel
     result = ioutil.to_csv_string(sample)
@@ -94,3 +105,243 @@ def test_csv_to_dict() -> None:
     result = ioutil.csv_to_dict(content)
 
     assert result == expected
+
+
+def test_read_csv_models(
+    tmp_path: Path,
+    mockmodel: tuple[list[MockModel], str],
+) -> None:
+    sample, expected = mockmodel
+    filepath = tmp_path / "models.csv"
+    filepath.write_text(expected)
+
+    result = ioutil.read_csv_models(str(filepath), MockModel)
+
+    assert list(result) == sample
+
+
+def test_read_csv_models_optional_and_extra_columns(tmp_path: Path) -> None:
+    filepath = tmp_path / "models.csv"
+    filepath.write_text("name,ratio,count,extra\nTest1,,3,x\nTest2,0.5,,y\n")
+
+    result = list(ioutil.read_csv_models(str(filepath), MockOptionalModel))
+
+    assert result == [
+        MockOptionalModel(name="Test1", ratio=None, count=3),
+        MockOptionalModel(name="Test2", ratio=0.5, count=None),
+    ]
+
+
+@pytest.mark.parametrize("row", ("Test1,one,True", "Test1,1,maybe"))
+def test_read_csv_models_bad_value_raises(tmp_path: Path, row: str) -> None:
+    filepath = tmp_path / "models.csv"
+    filepath.write_text(f"name,number,flag\n{row}\n")
+
+    with pytest.raises(ValueError, match="line 2"):
+        list(ioutil.read_csv_models(str(filepath), MockModel))
+
+
+def test_append_to_file(mock_filename: str) -> None:
+    ioutil.append_to_file(mock_filename, "This is ")
+    ioutil.append_to_file(mock_filename, "a test.")
+
+    verify = ioutil.read_from_file(mock_filename)
+
+    assert verify == "This is a test."
+
+
+def test_write_csv_stream(
+    tmp_path: Path,
+    mockmodel: tuple[list[MockModel], str],
+) -> None:
+    sample, expected = mockmodel
+    filepath = str(tmp_path / "stream.csv")
+
+    result = ioutil.write_csv_stream(filepath, iter(sample))
+
+    assert result == 4
+    assert Path(filepath).read_bytes().decode() == expected
+
+
+def test_write_csv_stream_empty(tmp_path: Path) -> None:
+    filepath = tmp_path / "stream.csv"
+
+    result = ioutil.write_csv_stream(str(filepath), iter([]))
+
+    assert result == 0
+    assert not filepath.exists()
+
+
+def test_write_csv_stream_handle(mockmodel: tuple[list[MockModel], str]) -> None:
+    sample, expected = mockmodel
+    handle = StringIO()
+
+    ioutil.write_csv_stream(handle, sample)
+
+    assert not handle.closed
+    assert handle.getvalue() == expected
+
+
+def test_write_csv_stream_stdout(
+    mockmodel: tuple[list[MockModel], str],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    sample, expected = mockmodel
+
+    ioutil.write_csv_stream("-", sample, ["name"])
+
+    assert capsys.readouterr().out.replace("\r\n", "\n").startswith("name\nTest1\n")
+
+
+def test_write_csv_stream_gzip(
+    tmp_path: Path,
+    mockmodel: tuple[list[MockModel], str],
+) -> None:
+    sample, expected = mockmodel
+    filepath = tmp_path / "stream.csv.gz"
+
+    ioutil.write_csv_stream(str(filepath), sample, compress=True)
+
+    assert gzip.decompress(filepath.read_bytes()).decode() == expected
+
+
+def test_write_csv_stream_gzip_handle_raises() -> None:
+    with pytest.raises(ValueError):
+        ioutil.write_csv_stream(StringIO(), [], compress=True)
+
+
+@dataclass
+class MockNestedModel(Base):
+    name: str
+    teams: list[str]
+
+
+def test_write_jsonl_stream_keeps_types(tmp_path: Path) -> None:
+    sample = [MockNestedModel("Test1", ["a", "b"]), MockNestedModel("Test2", [])]
+    filepath = tmp_path / "stream.jsonl.gz"
+
+    result = ioutil.write_jsonl_stream(str(filepath), sample, compress=True)
+    lines = gzip.decompress(filepath.read_bytes()).decode().splitlines()
+
+    assert result == 2
+    assert [json.loads(line) for line in lines] == [
+        {"name": "Test1", "teams": ["a", "b"]},
+        {"name": "Test2", "teams": []},
+    ]
+
+
+def test_write_jsonl_stream_fieldnames(
+    mockmodel: tuple[list[MockModel], str],
+) -> None:
+    sample, _ = mockmodel
+    handle = StringIO()
+
+    ioutil.write_jsonl_stream(handle, sample[:1], ["flag", "missing"])
+
+    assert handle.getvalue() == '{"flag": true, "missing": null}\n'
+
+
+def test_write_jsonl_stream_empty(tmp_path: Path) -> None:
+    filepath = tmp_path / "stream.jsonl"
+
+    assert ioutil.write_jsonl_stream(str(filepath), iter([])) == 0
+    assert not filepath.exists()
+
+
+def test_write_stream_dispatches_format(
+    mockmodel: tuple[list[MockModel], str],
+) -> None:
+    sample, expected = mockmodel
+    csv_handle = StringIO()
+    jsonl_handle = StringIO()
+
+    ioutil.write_stream(csv_handle, sample)
+    ioutil.write_stream(jsonl_handle, sample, output_format="jsonl")
+
+    assert csv_handle.getvalue() == expected
+    assert jsonl_handle.getvalue().count("\n") == 4
+
+
+def test_write_stream_unknown_format_raises() -> None:
+    with pytest.raises(ValueError, match="expected: csv, jsonl"):
+        ioutil.write_stream(StringIO(), [], output_format="xml")
+
+
+def test_register_output_format(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ioutil, "OUTPUT_FORMATS", dict(ioutil.OUTPUT_FORMATS))
+    fmt = ioutil.OutputFormat("mock", "mck", lambda *args, **kwargs: 42, binary=True)
+
+    ioutil.register_output_format(fmt)
+
+    assert ioutil.write_stream("mock", [], output_format="mock") == 42
+    assert ioutil.output_filename("report", "mock", compress=True) == "report.mck"
+
+
+@pytest.mark.parametrize(
+    ("output_format", "compress", "expected"),
+    (
+        ("csv", False, "report.csv"),
+        ("jsonl", True, "report.jsonl.gz"),
+    ),
+)
+def test_output_filename(output_format: str, compress: bool, expected: str) -> None:
+    assert ioutil.output_filename("report", output_format, compress) == expected
+
+
+def test_write_parquet_stream(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(ioutil, "PARQUET_ROW_GROUP_SIZE", 2)
+    sample = [MockNestedModel(f"Test{idx}", ["a"] * idx) for idx in range(5)]
+    filepath = tmp_path / "stream.parquet"
+
+    result = ioutil.write_parquet_stream(str(filepath), iter(sample), compress=True)
+    parquet_file = parquet.ParquetFile(filepath)
+
+    assert result == 5
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().to_pylist()[2] == {"name": "Test2", "teams": ["a", "a"]}
+
+
+def test_write_parquet_stream_handle_raises() -> None:
+    pytest.importorskip("pyarrow")
+
+    with pytest.raises(ValueError):
+        ioutil.write_parquet_stream(StringIO(), [])
+
+
+def test_write_parquet_stream_schema_from_annotations(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(ioutil, "PARQUET_ROW_GROUP_SIZE", 2)
+    sample = [
+        MockOptionalModel("Test1", None),
+        MockOptionalModel("Test2", None),
+        MockOptionalModel("Test3", 0.5, 3),
+    ]
+    filepath = tmp_path / "stream.parquet"
+
+    result = ioutil.write_parquet_stream(str(filepath), sample)
+    table = parquet.read_table(filepath)
+
+    assert result == 3
+    assert [str(type_) for type_ in table.schema.types] == ["string", "double", "int64"]
+    assert table.schema.field("name").nullable is False
+    assert table.to_pylist()[2] == {"name": "Test3", "ratio": 0.5, "count": 3}
+
+
+def test_write_parquet_stream_nested_types(tmp_path: Path) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    filepath = tmp_path / "stream.parquet"
+
+    ioutil.write_parquet_stream(str(filepath), [MockNestedModel("Test1", [])])
+    table = parquet.read_table(filepath)
+
+    teams = table.schema.field("teams").type
+
+    assert teams.num_fields == 1
+    assert str(teams.value_type) == "string"
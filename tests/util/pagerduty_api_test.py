@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Any
 from unittest.mock import patch
 
+import httpx
 import pytest
 from httpx import Response
 from pd_utils.util import PagerDutyAPI
@@ -134,3 +135,158 @@ def test_put_failure(pdapi: PagerDutyAPI) -> None:
         result = pdapi.put("/incidents")
 
     assert result is None
+
+
+@pytest.mark.parametrize(
+    ("status", "content", "expected"),
+    (
+        (200, '{"incidents": [{"id": "mock"}]}', [{"id": "mock"}]),
+        (200, '{"incidents": []}', []),
+        (200, "not json", None),
+        (400, '{"error": "bad"}', None),
+    ),
+)
+def test_put_bulk(
+    pdapi: PagerDutyAPI,
+    status: int,
+    content: str,
+    expected: list[dict[str, Any]] | None,
+) -> None:
+    resp = Response(status, content=content)
+    updates = [{"id": "mock", "status": "resolved"}]
+    with patch.object(pdapi._http, "put", return_value=resp) as mock:
+        result = pdapi.put_bulk("/incidents", "incidents", updates)
+        kwargs = mock.call_args.kwargs
+
+    assert result == expected
+    assert kwargs["json"] == {"incidents": updates}
+
+
+def test_put_bulk_transport_error(pdapi: PagerDutyAPI) -> None:
+    updates = [{"id": "mock", "status": "resolved"}]
+    error = httpx.ReadTimeout("mock timeout")
+
+    with patch.object(pdapi._http, "put", side_effect=error):
+        result = pdapi.put_bulk("/incidents", "incidents", updates)
+
+    assert result is None
+
+
+def test_list_iter(pdapi: PagerDutyAPI) -> None:
+    resps = json.loads(INCIDENTS_RESP)
+    resp = [Response(200, content=json.dumps(r)) for r in resps]
+    pdapi.set_query_target("/schedules", "schedules")
+    pdapi.set_query_params({"mock": "param"})
+
+    with patch.object(pdapi._http, "get", side_effect=resp) as mock:
+
+        results = list(
+            pdapi.list_iter("/incidents", "incidents", {"a": "b", "c": None}, 1)
+        )
+        kwargs = mock.call_args.kwargs
+
+    assert not {r["id"] for r in results} - EXPECTED_IDS
+    assert kwargs["params"] == {"offset": 1, "limit": 1, "total": False, "a": "b"}
+    assert pdapi.route == "/schedules"
+    assert pdapi._params == {"mock": "param"}
+
+
+def test_window_iter_splits_over_ceiling(pdapi: PagerDutyAPI) -> None:
+    pages = {
+        ("2022-08-01T00:00:00Z", "2022-08-03T00:00:00Z", 0): ([{"id": "x"}], True, 20),
+        ("2022-08-01T00:00:00Z", "2022-08-02T00:00:00Z", 0): (
+            [{"id": "a"}, {"id": "b"}],
+            True,
+            3,
+        ),
+        ("2022-08-01T00:00:00Z", "2022-08-02T00:00:00Z", 2): ([{"id": "c"}], False, 0),
+        ("2022-08-02T00:00:00Z", "2022-08-03T00:00:00Z", 0): (
+            [{"id": "c"}, {"id": "d"}],
+            False,
+            2,
+        ),
+    }
+
+    def _list(*args: Any, offset: int = 0, **kwargs: Any) -> Any:
+        return pages[(args[2]["since"], args[2]["until"], offset)]
+
+    pdapi.offset_ceiling = 10
+    with patch.object(pdapi, "_list", side_effect=_list) as mock:
+
+        results = pdapi.window_iter(
+            "/mock",
+            "mock",
+            {"mock": "param", "none": None},
+            "2022-08-01T00:00:00Z",
+            "2022-08-03T00:00:00Z",
+            limit=2,
+        )
+        ids = [result["id"] for result in results]
+
+    assert ids == ["a", "b", "c", "d"]
+    assert mock.call_count == 4
+    assert mock.call_args.args[2] == {
+        "mock": "param",
+        "since": "2022-08-02T00:00:00Z",
+        "until": "2022-08-03T00:00:00Z",
+    }
+
+
+def test_window_iter_max_days(pdapi: PagerDutyAPI) -> None:
+    with patch.object(pdapi, "_list", return_value=([], False, 0)) as mock:
+
+        results = pdapi.window_iter(
+            "/mock",
+            "mock",
+            None,
+            "2022-08-01T00:00:00Z",
+            "2022-08-03T12:00:00Z",
+            max_days=1,
+        )
+
+        assert list(results) == []
+    assert mock.call_count == 3
+
+
+def test_window_iter_stops_at_ceiling(pdapi: PagerDutyAPI) -> None:
+    page = ([{"id": "a"}, {"id": "b"}], True, 9)
+    pdapi.offset_ceiling = 4
+
+    with patch.object(pdapi, "_list", return_value=page) as mock:
+
+        results = pdapi.window_iter(
+            "/mock",
+            "mock",
+            None,
+            "2022-08-01T00:00:00Z",
+            "2022-08-01T00:00:01Z",
+            limit=2,
+        )
+
+        assert len(list(results)) == 4
+    assert mock.call_count == 2
+
+
+def test_cursor_iter(pdapi: PagerDutyAPI) -> None:
+    resp = [
+        Response(200, content=json.dumps({"records": [{"id": 1}], "next_cursor": "a"})),
+        Response(
+            200, content=json.dumps({"records": [{"id": 2}], "next_cursor": None})
+        ),
+    ]
+
+    with patch.object(pdapi._http, "get", side_effect=resp) as mock:
+
+        results = list(pdapi.cursor_iter("/audit/records", "records", {"a": None}, 5))
+        first_params = mock.call_args_list[0].kwargs["params"]
+        last_params = mock.call_args_list[1].kwargs["params"]
+
+    assert results == [{"id": 1}, {"id": 2}]
+    assert first_params == {"limit": 5}
+    assert last_params == {"limit": 5, "cursor": "a"}
+
+
+def test_cursor_iter_failure(pdapi: PagerDutyAPI) -> None:
+    with patch.object(pdapi._http, "get", return_value=Response(400, content="")):
+        with pytest.raises(pdapi.QueryError):
+            list(pdapi.cursor_iter("/audit/records", "records"))
@@ -50,6 +50,16 @@ def test_add_standard_arguments_toggled_off(runtime: RuntimeInit) -> None:
     assert "timeout" not in args
 
 
+def test_add_output_arguments(runtime: RuntimeInit) -> None:
+    runtime.add_output_arguments()
+
+    default = runtime.parse_args([])
+    args = runtime.parse_args(["--gzip"])
+
+    assert default.gzip is False
+    assert args.gzip is True
+
+
 def test_init_logging(runtime: RuntimeInit, caplog: LogCaptureFixture) -> None:
     prior_level = logging.getLogger().level
     logger = logging.getLogger("init_logging")
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+
+import pytest
+from pd_utils.util import threadutil
+
+
+def test_bounded_map_keeps_order() -> None:
+    results = threadutil.bounded_map(lambda x: x * 2, range(50), workers=8)
+
+    assert list(results) == [(x, x * 2) for x in range(50)]
+
+
+def test_bounded_map_pulls_items_lazily() -> None:
+    pulled: list[int] = []
+
+    def items() -> Generator[int, None, None]:
+        for item in range(100):
+            pulled.append(item)
+            yield item
+
+    results = threadutil.bounded_map(lambda x: x, items(), workers=2, backlog=5)
+    first = next(results)
+    results.close()
+
+    assert first == (0, 0)
+    assert len(pulled) == 5
+
+
+def test_bounded_map_raises_errors() -> None:
+    def func(item: int) -> int:
+        if item == 3:
+            raise ValueError("three")
+        return item
+
+    with pytest.raises(ValueError):
+        list(threadutil.bounded_map(func, range(5), workers=2))